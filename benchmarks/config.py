@@ -0,0 +1,126 @@
+"""Measures decoding nested settings documents with Configurable.from_config
+
+Run with: python benchmarks/config.py
+"""
+
+import pathlib
+import shutil
+import tempfile
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench
+
+ITERATIONS = 2000
+MENU_BUTTONS = 50
+MENU_IMAGE_SIZE = (200, 40)
+
+
+def text_box_document() -> dict:
+    return {
+        "font": "font.ttf, 16",
+        "color": "white",
+        "bg_color": [0, 0, 0, 128],
+        "justify": True,
+        "wrap_mode": "balanced",
+        "align": "center",
+        "text_speed": 4,
+        "keepalive": 2.5,
+        "skip": {"key": "space"},
+        "advance_text": {"key": "return", "mods": ["left shift"]},
+        "margins": {"top": 6, "left": 8, "right": 8, "bottom": 6},
+        "box_sprite": {"topleft": [20, 300], "width": 600, "height": 160},
+        "indicator": {"topleft": [600, 440], "width": 8, "height": 8, "layer": 2},
+    }
+
+
+def game_document() -> dict:
+    return {
+        "game_width": 640,
+        "game_height": 480,
+        "screen_width": 1280,
+        "screen_height": 960,
+        "fullscreen": False,
+        "fixed_timestep": 0.01,
+        "scale_mode": "integer",
+        "text_cache_policy": "lfu",
+        "key_map": {
+            f"action{i}": {"key": key, "toggle": i % 2 == 0}
+            for i, key in enumerate("abcdefghijklmnop")
+        },
+    }
+
+
+def button_documents() -> list:
+    return [
+        {
+            "topleft": [20, 20 + i * 10],
+            "width": 200,
+            "height": 40,
+            "text": f"Button {i}",
+            "hover_color": "yellow",
+        }
+        for i in range(MENU_BUTTONS)
+    ]
+
+
+def image_button_documents(resource_dir: pathlib.Path) -> list:
+    buttons = button_documents()
+    for i, button in enumerate(buttons):
+        button["image"] = f"button{i}.png"
+        pygame.image.save(
+            pygame.Surface(MENU_IMAGE_SIZE), resource_dir / f"button{i}.png"
+        )
+    return buttons
+
+
+def decode_cold(buttons: list, lazy: bool):
+    # drop previously loaded images so every iteration decodes them again
+    dps.asset_registry.clear()
+    return [dps.ButtonOptions.from_config(b, lazy=lazy) for b in buttons]
+
+
+def main():
+    bench.use_dummy_display()
+    resource_dir = pathlib.Path(tempfile.mkdtemp())
+    dps.init(resource_dir, "Benchmarks")
+    # use pygame's bundled font so the document loads a real font file
+    default_font = pathlib.Path(pygame.font.__file__).parent / "freesansbold.ttf"
+    shutil.copy(default_font, resource_dir / "font.ttf")
+
+    text_box, game, buttons = text_box_document(), game_document(), button_documents()
+    # images are converted to the display format when loaded
+    pygame.display.set_mode((640, 480))
+    image_buttons = image_button_documents(resource_dir)
+    results = [
+        bench.measure(
+            "TextBoxSettings",
+            lambda: dps.TextBoxSettings.from_config(text_box),
+            ITERATIONS,
+        ),
+        bench.measure(
+            "GameSettings", lambda: dps.GameSettings.from_config(game), ITERATIONS
+        ),
+        bench.measure(
+            f"{MENU_BUTTONS} ButtonOptions",
+            lambda: [dps.ButtonOptions.from_config(b) for b in buttons],
+            ITERATIONS // 10,
+        ),
+        bench.measure(
+            f"{MENU_BUTTONS} image ButtonOptions",
+            lambda: decode_cold(image_buttons, lazy=False),
+            ITERATIONS // 100,
+        ),
+        bench.measure(
+            f"{MENU_BUTTONS} image ButtonOptions (lazy)",
+            lambda: decode_cold(image_buttons, lazy=True),
+            ITERATIONS // 100,
+        ),
+    ]
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
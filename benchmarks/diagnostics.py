@@ -0,0 +1,40 @@
+"""Runs the diagnostics overlay over an empty scene
+
+Every engine metric is shown, plus a value that changes every frame.
+
+Run with: python benchmarks/diagnostics.py
+"""
+
+import tempfile
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench
+
+FRAMES = 2000
+
+
+class BenchDiagnostics(dps.Diagnostics):
+    def update(self, dt: float):
+        self.add("frame", self._frame)
+        self._frame += 1
+        super().update(dt)
+
+    _frame = 0
+
+
+def main():
+    bench.use_dummy_display()
+    dps.init(tempfile.mkdtemp(), "Benchmarks")
+    settings = dps.DiagnosticsSettings(
+        font=pygame.font.Font(None, 18), color="white", bg_color="black"
+    )
+    result = bench.run_scene(
+        lambda game: BenchDiagnostics(settings, game.draw_surface), frames=FRAMES
+    )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Compares a glyph atlas text renderer prototype against font.render
+
+The prototype rasterizes each glyph once into an atlas surface per font,
+color and antialias setting, and composes strings with a single
+Surface.blits call, placing glyphs by the advances from Font.metrics().
+This is the backend that was considered for dynamic text (score counters,
+diagnostics) and rejected in favour of letting such text skip the text
+cache. Run it to check whether that still holds, eg. after a pygame or
+SDL_ttf upgrade.
+
+For each font size, prints the time to compose a string with font.render
+and with the atlas, and how many pixels of the composed string differ from
+font.render's output (at the best horizontal offset of up to 2px). The
+atlas is measured twice: placing glyphs by their rounded advances, and at
+exact pen positions measured with font.size() for every prefix of the
+string. pygame doesn't expose kerning or fractional pen positions, so
+neither can match font.render exactly.
+
+Run with: python benchmarks/glyphatlas.py
+"""
+
+import tempfile
+from typing import Dict, List, Tuple
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench
+
+ITERATIONS = 2000
+SIZES = (16, 24, 48, 96)
+TEXT = "Score: 1234567"
+COLOR = (255, 255, 255, 255)
+# glyphs rasterized into the atlas
+CHARSET = "".join(chr(c) for c in range(32, 127))
+
+
+class GlyphAtlas:
+    """Prototype renderer composing strings from pre-rasterized glyphs"""
+
+    def __init__(self, font: pygame.font.Font, color: Tuple, antialias: bool):
+        self.font = font
+        self.height = font.get_height()
+        # glyph -> area in the atlas, advance in pixels
+        self.glyphs: Dict[str, Tuple[pygame.Rect, int]] = {}
+
+        rendered: List[Tuple[str, pygame.Surface, int]] = []
+        for char, metrics in zip(CHARSET, font.metrics(CHARSET), strict=True):
+            if metrics is None:
+                continue
+            surface = font.render(char, antialias, color)
+            rendered.append((char, surface, metrics[4]))
+        width = sum(surface.get_width() for _, surface, _ in rendered)
+        self.atlas = pygame.Surface((width, self.height), pygame.SRCALPHA)
+
+        # pack glyphs in a single row. each glyph keeps its full rendered
+        # box, so it's drawn at the pen position with no bearing offset
+        x = 0
+        for char, surface, advance in rendered:
+            self.atlas.blit(surface, (x, 0))
+            rect = pygame.Rect(x, 0, surface.get_width(), surface.get_height())
+            self.glyphs[char] = (rect, advance)
+            x += surface.get_width()
+
+    def render(self, text: str, exact_pens: bool = False) -> pygame.Surface:
+        width = self.font.size(text)[0]
+        surface = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        blits = []
+        pen = 0
+        for i, char in enumerate(text):
+            rect, advance = self.glyphs[char]
+            if exact_pens:
+                pen = self.font.size(text[:i])[0]
+            blits.append((self.atlas, (pen, 0), rect))
+            pen += advance
+        surface.blits(blits, doreturn=False)
+        return surface
+
+
+def alpha_diff(a: pygame.Surface, b: pygame.Surface, dx: int) -> int:
+    """Returns the number of pixels whose alpha differs, with a shifted by dx"""
+    w, h = b.get_size()
+    diff = 0
+    for y in range(h):
+        for x in range(w):
+            ax = x - dx
+            alpha_a = a.get_at((ax, y)).a if 0 <= ax < a.get_width() else 0
+            if abs(alpha_a - b.get_at((x, y)).a) > 8:
+                diff += 1
+    return diff
+
+
+def main():
+    bench.use_dummy_display()
+    dps.init(tempfile.mkdtemp(), "Benchmarks")
+    pygame.display.set_mode((640, 480))
+
+    for size in SIZES:
+        compare(pygame.font.Font(None, size), size)
+
+
+def compare(font: pygame.font.Font, size: int):
+    atlas = GlyphAtlas(font, COLOR, True)
+    runs = {
+        "font.render": lambda: font.render(TEXT, True, COLOR),
+        "glyph atlas": lambda: atlas.render(TEXT),
+        "glyph atlas, exact pens": lambda: atlas.render(TEXT, exact_pens=True),
+    }
+    rendered = font.render(TEXT, True, COLOR)
+    pixels = rendered.get_width() * rendered.get_height()
+    for name, fn in runs.items():
+        print(bench.measure(f"{size}pt {name}", fn, ITERATIONS))
+        diffs = {dx: alpha_diff(fn(), rendered, dx) for dx in range(-2, 3)}
+        dx = min(diffs, key=diffs.get)
+        print(
+            f"  pixels   {diffs[dx]}/{pixels} differ from font.render"
+            f" (best offset {dx}px)"
+        )
+
+
+if __name__ == "__main__":
+    main()
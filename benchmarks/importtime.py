@@ -0,0 +1,69 @@
+"""Measures how long importing the package takes, with python -X importtime
+
+Each statement runs in a fresh interpreter several times, and the median is
+reported. Exits with an error if an import goes over its budget, so startup
+regressions are caught, eg. a submodule importing something heavy at the top.
+
+Run with: python benchmarks/importtime.py
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+RUNS = 7
+PACKAGE = "pygame_dps_core"
+
+# statement -> budget in milliseconds for the package's own modules, or None
+STATEMENTS: Dict[str, float | None] = {
+    f"import {PACKAGE}": 20,
+    f"from {PACKAGE} import Configurable": None,
+    f"from {PACKAGE} import KeyBinding": None,
+    f"from {PACKAGE} import Game": None,
+    f"from {PACKAGE} import *": None,
+}
+
+
+def import_times(statement: str) -> Tuple[float, float]:
+    """Returns the total and package-only import times in milliseconds"""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    total = package = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # only top level imports count towards the total, as the cumulative
+        # time of each includes the modules it imports
+        if not name.startswith("  ") and name.strip():
+            total += int(cumulative_us)
+        if name.strip().startswith(PACKAGE):
+            package += int(self_us)
+    return total / 1000, package / 1000
+
+
+def main():
+    over_budget: List[str] = []
+    for statement, budget in STATEMENTS.items():
+        runs = [import_times(statement) for _ in range(RUNS)]
+        total = statistics.median(t for t, _ in runs)
+        package = statistics.median(p for _, p in runs)
+        print(f"{statement}: {total:.1f}ms total, {package:.1f}ms in {PACKAGE}")
+        if budget is not None and package > budget:
+            over_budget.append(f"{statement} ({package:.1f}ms > {budget}ms)")
+
+    if over_budget:
+        print("Over budget:", ", ".join(over_budget), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Runs a menu of text buttons with the mouse sweeping across them
+
+Run with: python benchmarks/menu.py
+"""
+
+import tempfile
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench, ui
+
+FRAMES = 2000
+BUTTONS = 8
+
+
+class BenchMenu(ui.Menu):
+    def __init__(self, screen: pygame.Surface):
+        super().__init__(screen)
+        font = pygame.font.Font(None, 28)
+        text_opts = dps.TextOptions(font=font, color="white")
+        for i in range(BUTTONS):
+            self.buttons.add(
+                ui.Button(
+                    ui.ButtonOptions(
+                        topleft=(220, 40 + i * 50),
+                        width=200,
+                        height=40,
+                        text=f"Option {i + 1}",
+                        hover_color="yellow",
+                        text_opts=text_opts,
+                    ),
+                    on_click=lambda: None,
+                )
+            )
+
+
+def sweep(frame: int):
+    # move down the menu, hovering each button in turn
+    return [bench.mouse_move((320, 40 + (frame * 5) % (BUTTONS * 50)))]
+
+
+def main():
+    bench.use_dummy_display()
+    dps.init(tempfile.mkdtemp(), "Benchmarks")
+    result = bench.run_scene(
+        lambda game: BenchMenu(game.draw_surface), frames=FRAMES, events=sweep
+    )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measures saving and loading a large world with SaveData, against pickle
+
+Run with: python benchmarks/savedata.py
+"""
+
+import pathlib
+import pickle
+import tempfile
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench
+
+ITERATIONS = 50
+LEVELS = 40
+TILES_PER_LEVEL = 64 * 64
+
+
+def world() -> dict:
+    return {
+        f"level{i}": {
+            "tiles": [(x * i) % 16 for x in range(TILES_PER_LEVEL)],
+            "entities": [{"id": n, "pos": [n, i]} for n in range(50)],
+        }
+        for i in range(LEVELS)
+    }
+
+
+def main():
+    bench.use_dummy_display()
+    dps.init(pathlib.Path(tempfile.mkdtemp()), "Benchmarks")
+    levels = world()
+    player = {"hp": 10, "pos": [0, 0], "level": "level0"}
+
+    with dps.SaveData("bench.sav") as save:
+        for name, level in levels.items():
+            save.set(name, level)
+        save.set("player", player)
+        save.save()
+
+        def incremental_save():
+            player["pos"][0] += 1
+            save.set("player", player)
+            save.save()
+
+        def load_level():
+            with dps.SaveData("bench.sav") as loaded:
+                return loaded.get("player"), loaded.get("level0")
+
+        results = [
+            bench.measure("SaveData incremental save", incremental_save, ITERATIONS),
+            bench.measure("SaveData load one level", load_level, ITERATIONS),
+        ]
+
+    pickle_file = pathlib.Path(tempfile.mkdtemp()) / "bench.pickle"
+
+    def pickle_save():
+        player["pos"][0] += 1
+        with open(pickle_file, "wb") as f:
+            pickle.dump({"levels": levels, "player": player}, f)
+
+    def pickle_load():
+        with open(pickle_file, "rb") as f:
+            data = pickle.load(f)
+        return data["player"], data["levels"]["level0"]
+
+    results += [
+        bench.measure("pickle save", pickle_save, ITERATIONS),
+        bench.measure("pickle load", pickle_load, ITERATIONS),
+    ]
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
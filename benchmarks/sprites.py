@@ -0,0 +1,90 @@
+"""Measures allocations for sprites recreated every frame, with and without a
+sprite pool
+
+Run with: python benchmarks/sprites.py
+"""
+
+import tempfile
+import tracemalloc
+from typing import Callable, List
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench, sprites, text
+
+ITERATIONS = 500
+SIZE_SAMPLES = 1000
+PARTICLES = 200
+TEXT = "\n".join(
+    f"Line {i}: the quick brown fox jumps over the lazy dog" for i in range(6)
+)
+
+
+def bytes_per_sprite(create: Callable[[], pygame.sprite.Sprite]) -> float:
+    """Returns the memory allocated for each sprite that's kept alive"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [create() for _ in range(SIZE_SAMPLES)]
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return allocated / SIZE_SAMPLES
+
+
+def main():
+    bench.use_dummy_display()
+    dps.init(tempfile.mkdtemp(), "Benchmarks")
+    pygame.display.set_mode((640, 480))
+
+    particle = pygame.Surface((4, 4), pygame.SRCALPHA)
+    particle.fill("white")
+    font = pygame.font.Font(None, 24)
+    opts = text.TextOptions(font=font, color="white")
+    dest = pygame.Rect(20, 20, 600, 400)
+    group = pygame.sprite.LayeredUpdates()
+    pool = sprites.SpritePool()
+
+    def new_particles():
+        group.empty()
+        group.add(
+            sprites.GameSprite(sprites.SpriteOptions((i, i), image=particle))
+            for i in range(PARTICLES)
+        )
+
+    def pooled_particles():
+        pool.release(*group.sprites())
+        group.add(pool.acquire(particle, (i, i)) for i in range(PARTICLES))
+
+    def new_text():
+        group.empty()
+        group.add(text.multiline_text(TEXT, opts, dest))
+
+    def pooled_text():
+        pool.release(*group.sprites())
+        group.add(text.multiline_text(TEXT, opts, dest, pool=pool))
+
+    results: List[bench.BenchResult] = []
+    for name, fn in [
+        ("new sprites: particles", new_particles),
+        ("pooled sprites: particles", pooled_particles),
+        ("new sprites: text", new_text),
+        ("pooled sprites: text", pooled_text),
+    ]:
+        results.append(bench.measure(name, fn, ITERATIONS, alloc_iterations=50))
+        pool.release(*group.sprites())
+    for result in results:
+        print(result)
+
+    sizes = {
+        "GameSprite": lambda: sprites.GameSprite(sprites.SpriteOptions(image=particle)),
+        "LightSprite": lambda: sprites.LightSprite(particle),
+    }
+    for name, create in sizes.items():
+        print(f"{name}: {bytes_per_sprite(create):.0f} bytes/sprite")
+
+
+if __name__ == "__main__":
+    main()
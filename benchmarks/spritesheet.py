@@ -0,0 +1,60 @@
+"""Measures loading a sprite sheet and its animations from settings
+
+Run with: python benchmarks/spritesheet.py
+"""
+
+import pathlib
+import tempfile
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench
+
+ITERATIONS = 200
+ROWS = 8
+FRAMES_PER_ROW = 12
+SPRITE_SIZE = 32
+
+
+def write_resources(resource_dir: pathlib.Path):
+    sheet = pygame.Surface(
+        (FRAMES_PER_ROW * SPRITE_SIZE, ROWS * SPRITE_SIZE), pygame.SRCALPHA
+    )
+    for row in range(ROWS):
+        # leave the last frames of each row empty, so splitting
+        # has to find where each animation ends
+        for col in range(FRAMES_PER_ROW - row % 3):
+            rect = (col * SPRITE_SIZE + 4, row * SPRITE_SIZE + 4, 24, 24)
+            sheet.fill((40 * row % 255, 20 * col % 255, 200, 255), rect)
+    pygame.image.save(sheet, resource_dir / "sheet.png")
+
+    animations = "\n".join(
+        f"  - name: anim{row}\n    repeat: -1" for row in range(ROWS)
+    )
+    (resource_dir / "sheet.yaml").write_text(
+        f"sprite_sheet: sheet.png\n"
+        f"sprite_width: {SPRITE_SIZE}\n"
+        f"sprite_height: {SPRITE_SIZE}\n"
+        f"animation_opts:\n{animations}\n"
+    )
+
+
+def main():
+    bench.use_dummy_display()
+    resource_dir = pathlib.Path(tempfile.mkdtemp())
+    dps.init(resource_dir, "Benchmarks")
+    # images are converted for the display format when loaded
+    pygame.display.set_mode((640, 480))
+    write_resources(resource_dir)
+
+    result = bench.measure(
+        "SpriteSheet load",
+        lambda: dps.SpriteSheet.instance(settings_file="sheet.yaml"),
+        iterations=ITERATIONS,
+    )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Runs a typing 6-line text box through the headless game loop
+
+Run with: python benchmarks/textbox.py
+"""
+
+import tempfile
+from typing import List
+
+import pygame
+
+import pygame_dps_core as dps
+from pygame_dps_core import bench, sprites, text
+
+FRAMES = 2400
+# restart the text box periodically so every frame is spent typing
+RESTART_FRAMES = 600
+LINES = 6
+TEXT = " ".join(["The quick brown fox jumps over the lazy dog."] * 12)
+
+
+class BenchTextBox(text.TextBox):
+    frame = 0
+    dirty_area = 0
+
+    def update(self, dt: float):
+        if self.frame % RESTART_FRAMES == 0:
+            self.reset()
+            self.add_text(TEXT)
+        self.frame += 1
+        super().update(dt)
+
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
+        rects = super().draw(alpha)
+        self.dirty_area += sum(r.w * r.h for r in rects)
+        return rects
+
+
+def create_text_box(game: dps.Game) -> BenchTextBox:
+    font = pygame.font.Font(None, 24)
+    box = pygame.Surface((600, 12 + LINES * font.get_linesize()))
+    box.fill((40, 40, 80))
+    settings = text.TextBoxSettings(
+        font=font,
+        color="white",
+        justify=True,
+        text_speed=5,
+        keepalive=0,
+        margins=text.Margins(6, 6, 6, 6),
+        box_sprite=sprites.SpriteOptions(
+            topleft=(20, 300), width=box.get_width(), height=box.get_height(), image=box
+        ),
+        indicator=sprites.SpriteOptions(topleft=(600, 440), width=8, height=8),
+    )
+    return BenchTextBox(settings, game.draw_surface)
+
+
+def main():
+    bench.use_dummy_display()
+    dps.init(tempfile.mkdtemp(), "Benchmarks")
+    text_box = None
+
+    def factory(game: dps.Game) -> BenchTextBox:
+        nonlocal text_box
+        text_box = create_text_box(game)
+        return text_box
+
+    result = bench.run_scene(factory, frames=FRAMES)
+    print(result)
+    print(f"  dirty    {text_box.dirty_area / text_box.frame:.0f}px/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,174 @@
-from ._conf import init
-from .diagnostics import Diagnostics, DiagnosticsSettings
-from .game import Game, GameSettings
-from .io import Configurable, Loadable
-from .keys import KeyBinding, key
-from .scenes import Overlay, Scene, end_current_scene, get_active_scene, new_scene
-from .sprites import (
-    Animation,
-    AnimationOptions,
-    GameSprite,
-    SpriteOptions,
-    SpriteSheet,
-    SpriteSheetSettings,
-)
-from .text import (
-    Align,
-    Margins,
-    TextBox,
-    TextBoxSettings,
-    TextOptions,
-    TypewriterTextOptions,
-    VerticalAlign,
-    multiline_text,
-    text_sprite,
-    typewriter,
-)
-from .ui import Button, ButtonOptions, Menu
-from .utils import coroutine, debounce, normalize_path_str
+# public names are imported from their submodules on first access, so that
+# importing the package (eg. for Configurable alone) doesn't import every
+# submodule and its dependencies
+import importlib
+
+# typing is slow to import, and only needed by type checkers here. they
+# treat any TYPE_CHECKING constant as true
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from ._conf import init
+    from .assets import AssetRegistry
+    from .assets import registry as asset_registry
+    from .diagnostics import Diagnostics, DiagnosticsSettings
+    from .display import ScaleMode
+    from .game import Game, GameSettings
+    from .hotreload import HotReloader
+    from .io import Configurable, Loadable, LoadableRegistry
+    from .io import registry as loadable_registry
+    from .keys import KeyBinding, key
+    from .layout import TextLayout, WrapMode
+    from .metrics import Counter, Gauge, Histogram, MetricsExporter, Timer
+    from .metrics import registry as metrics_registry
+    from .preload import LoadingScene, Preloader
+    from .profiler import FrameProfiler, Phase
+    from .savedata import Compression, SaveData
+    from .scenes import (
+        Overlay,
+        Scene,
+        end_all_scenes,
+        end_current_scene,
+        get_active_scene,
+        new_scene,
+        replace_scene,
+    )
+    from .sprites import (
+        Animation,
+        AnimationOptions,
+        GameSprite,
+        LightSprite,
+        SpriteOptions,
+        SpritePool,
+        SpriteSheet,
+        SpriteSheetSettings,
+    )
+    from .text import (
+        Align,
+        CachePolicy,
+        Margins,
+        TextBox,
+        TextBoxSettings,
+        TextOptions,
+        TextSurfaceCache,
+        TypewriterTextOptions,
+        VerticalAlign,
+        multiline_text,
+        text_cache,
+        text_sprite,
+        typewriter,
+    )
+    from .ui import Button, ButtonOptions, Menu
+    from .utils import coroutine, debounce, normalize_path_str
+
+# exported name -> (submodule, attribute)
+_EXPORTS: dict[str, tuple[str, str]] = {
+    "Game": ("game", "Game"),
+    "GameSettings": ("game", "GameSettings"),
+    "ScaleMode": ("display", "ScaleMode"),
+    "FrameProfiler": ("profiler", "FrameProfiler"),
+    "Phase": ("profiler", "Phase"),
+    "Counter": ("metrics", "Counter"),
+    "Gauge": ("metrics", "Gauge"),
+    "Histogram": ("metrics", "Histogram"),
+    "Timer": ("metrics", "Timer"),
+    "MetricsExporter": ("metrics", "MetricsExporter"),
+    "metrics_registry": ("metrics", "registry"),
+    "AssetRegistry": ("assets", "AssetRegistry"),
+    "asset_registry": ("assets", "registry"),
+    "Animation": ("sprites", "Animation"),
+    "AnimationOptions": ("sprites", "AnimationOptions"),
+    "GameSprite": ("sprites", "GameSprite"),
+    "LightSprite": ("sprites", "LightSprite"),
+    "SpritePool": ("sprites", "SpritePool"),
+    "SpriteOptions": ("sprites", "SpriteOptions"),
+    "SpriteSheet": ("sprites", "SpriteSheet"),
+    "SpriteSheetSettings": ("sprites", "SpriteSheetSettings"),
+    "Button": ("ui", "Button"),
+    "ButtonOptions": ("ui", "ButtonOptions"),
+    "Menu": ("ui", "Menu"),
+    "Scene": ("scenes", "Scene"),
+    "Overlay": ("scenes", "Overlay"),
+    "Diagnostics": ("diagnostics", "Diagnostics"),
+    "DiagnosticsSettings": ("diagnostics", "DiagnosticsSettings"),
+    "Margins": ("text", "Margins"),
+    "TextBox": ("text", "TextBox"),
+    "TextBoxSettings": ("text", "TextBoxSettings"),
+    "TextOptions": ("text", "TextOptions"),
+    "TextSurfaceCache": ("text", "TextSurfaceCache"),
+    "CachePolicy": ("text", "CachePolicy"),
+    "TypewriterTextOptions": ("text", "TypewriterTextOptions"),
+    "Align": ("text", "Align"),
+    "VerticalAlign": ("text", "VerticalAlign"),
+    "TextLayout": ("layout", "TextLayout"),
+    "WrapMode": ("layout", "WrapMode"),
+    "Configurable": ("io", "Configurable"),
+    "Loadable": ("io", "Loadable"),
+    "LoadableRegistry": ("io", "LoadableRegistry"),
+    "loadable_registry": ("io", "registry"),
+    "KeyBinding": ("keys", "KeyBinding"),
+    "key": ("keys", "key"),
+    "get_active_scene": ("scenes", "get_active_scene"),
+    "new_scene": ("scenes", "new_scene"),
+    "end_current_scene": ("scenes", "end_current_scene"),
+    "end_all_scenes": ("scenes", "end_all_scenes"),
+    "replace_scene": ("scenes", "replace_scene"),
+    "Preloader": ("preload", "Preloader"),
+    "LoadingScene": ("preload", "LoadingScene"),
+    "HotReloader": ("hotreload", "HotReloader"),
+    "SaveData": ("savedata", "SaveData"),
+    "Compression": ("savedata", "Compression"),
+    "multiline_text": ("text", "multiline_text"),
+    "typewriter": ("text", "typewriter"),
+    "text_sprite": ("text", "text_sprite"),
+    "text_cache": ("text", "text_cache"),
+    "coroutine": ("utils", "coroutine"),
+    "debounce": ("utils", "debounce"),
+    "normalize_path_str": ("utils", "normalize_path_str"),
+    "init": ("_conf", "init"),
+}
+
+
+def __getattr__(name: str) -> object:
+    export = _EXPORTS.get(name)
+    if export is None:
+        # submodules were attributes of the package when it imported them
+        # all, so keep eg. pygame_dps_core.text working
+        try:
+            return importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{export[0]}", __name__)
+    value = getattr(module, export[1])
+    # cache the value so later lookups don't go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
+
 
 __all__ = [
     "Game",
     "GameSettings",
+    "ScaleMode",
+    "FrameProfiler",
+    "Phase",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Timer",
+    "MetricsExporter",
+    "metrics_registry",
+    "AssetRegistry",
+    "asset_registry",
     "Animation",
     "AnimationOptions",
     "GameSprite",
+    "LightSprite",
+    "SpritePool",
     "SpriteOptions",
     "SpriteSheet",
     "SpriteSheetSettings",
@@ -47,19 +183,33 @@ __all__ = [
     "TextBox",
     "TextBoxSettings",
     "TextOptions",
+    "TextSurfaceCache",
+    "CachePolicy",
     "TypewriterTextOptions",
     "Align",
     "VerticalAlign",
+    "TextLayout",
+    "WrapMode",
     "Configurable",
     "Loadable",
+    "LoadableRegistry",
+    "loadable_registry",
     "KeyBinding",
     "key",
     "get_active_scene",
     "new_scene",
     "end_current_scene",
+    "end_all_scenes",
+    "replace_scene",
+    "Preloader",
+    "LoadingScene",
+    "HotReloader",
+    "SaveData",
+    "Compression",
     "multiline_text",
     "typewriter",
     "text_sprite",
+    "text_cache",
     "coroutine",
     "debounce",
     "normalize_path_str",
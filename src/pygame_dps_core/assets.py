@@ -0,0 +1,227 @@
+import contextlib
+import dataclasses
+import os
+import pathlib
+import weakref
+from typing import Any, Dict, Hashable, Iterator, List, Set
+
+import pygame
+
+from . import _conf, metrics, utils
+from .logs import logger
+
+# scope for assets that should stay loaded until the registry is cleared
+GLOBAL_SCOPE = "global"
+
+
+@dataclasses.dataclass
+class AssetStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+
+class AssetRegistry:
+    """Process-wide cache of decoded images and fonts
+
+    Assets are keyed by their normalized path (and size, for fonts), so every
+    reference to the same file shares a single decoded copy. Shared surfaces
+    must not be drawn on; copy them first.
+
+    The registry only holds weak references to assets, so an asset is freed
+    once nothing in the game uses it. Assets are also held strongly by the
+    scope they were loaded in (see scope()) until the scope is released, so
+    assets a scene loads aren't reloaded when briefly unused. Scenes release
+    their scope when they end.
+    """
+
+    def __init__(self):
+        self.stats = AssetStats()
+        self._assets: weakref.WeakValueDictionary[Hashable, Any] = (
+            weakref.WeakValueDictionary()
+        )
+        self._sizes: Dict[Hashable, int] = {}
+        self._finalizers: Dict[Hashable, weakref.finalize] = {}
+        self._scopes: Dict[Hashable, Dict[Hashable, Any]] = {GLOBAL_SCOPE: {}}
+        self._scope_stack: List[Hashable] = [GLOBAL_SCOPE]
+
+    @contextlib.contextmanager
+    def scope(self, name: Hashable) -> Iterator[None]:
+        """Holds assets loaded inside the context until release(name)"""
+        self._scopes.setdefault(name, {})
+        self._scope_stack.append(name)
+        try:
+            yield
+        finally:
+            self._scope_stack.pop()
+
+    @property
+    def current_scope(self) -> Hashable:
+        """The scope newly loaded assets are held by"""
+        return self._scope_stack[-1]
+
+    def release(self, name: Hashable):
+        """Drops the scope's references to its assets
+
+        Assets are freed once they aren't used by anything else, such as
+        sprites in another scene or another scope.
+        """
+        if name == GLOBAL_SCOPE:
+            raise pygame.error("The global asset scope can't be released")
+        held = self._scopes.pop(name, None)
+        if held:
+            self.stats.evictions += len(held)
+            logger.debug("Released %d assets held by %s", len(held), name)
+
+    def clear(self):
+        """Drops the references held by every scope, including the global one"""
+        for held in self._scopes.values():
+            self.stats.evictions += len(held)
+            held.clear()
+
+    def invalidate(self, path: str | os.PathLike) -> int:
+        """Forgets the assets loaded from a file, eg. after it changed
+
+        Later loads decode the file again. Assets already in use aren't
+        affected.
+
+        Returns:
+            int: the number of assets forgotten
+        """
+        filepath = resource_path(path)
+        keys = [key for key in self._sizes if key[1] == filepath]
+        for key in keys:
+            self._finalizers.pop(key).detach()
+            self._assets.pop(key, None)
+            for held in self._scopes.values():
+                held.pop(key, None)
+            self._forget(key)
+        if keys:
+            logger.debug("Invalidated %d assets loaded from %s", len(keys), path)
+        return len(keys)
+
+    def image(
+        self, path: str | os.PathLike, convert_alpha: bool = True
+    ) -> pygame.Surface:
+        """Loads an image relative to the resource directory
+
+        Args:
+            path (str | os.PathLike): path to the image file
+            convert_alpha (bool): convert the image to the display format
+                with per-pixel alpha, for faster blits. requires the display
+                mode to be set
+        """
+        img = self._get(_image_key(path, convert_alpha))
+        if img is None:
+            img = self.add_image(path, pygame.image.load(resource_path(path)))
+        return img
+
+    def add_image(
+        self, path: str | os.PathLike, img: pygame.Surface, convert_alpha: bool = True
+    ) -> pygame.Surface:
+        """Adds an image that was loaded elsewhere, eg. on another thread
+
+        Returns:
+            pygame.Surface: the registered image, converted if requested
+        """
+        key = _image_key(path, convert_alpha)
+        existing = self._get(key)
+        if existing is not None:
+            return existing
+        if convert_alpha:
+            img = img.convert_alpha()
+        self._add(key, img, img.get_pitch() * img.get_height())
+        return img
+
+    def font(self, path: str | os.PathLike, size: int) -> pygame.font.Font:
+        """Loads a font file relative to the resource directory"""
+        font = self._get(_font_key(path, size))
+        if font is None:
+            font = self.add_font(
+                path, size, pygame.font.Font(resource_path(path), size)
+            )
+        return font
+
+    def add_font(
+        self, path: str | os.PathLike, size: int, font: pygame.font.Font
+    ) -> pygame.font.Font:
+        """Adds a font that was loaded elsewhere, eg. from preloaded bytes"""
+        key = _font_key(path, size)
+        existing = self._get(key)
+        if existing is not None:
+            return existing
+        self._add(key, font, os.path.getsize(resource_path(path)))
+        return font
+
+    def sys_font(self, **kwargs) -> pygame.font.Font:
+        """Loads a system font with arguments to pygame.font.SysFont"""
+        key = ("sys_font", tuple(sorted(kwargs.items())))
+        font = self._get(key)
+        if font is None:
+            font = pygame.font.SysFont(**kwargs)
+            self._add(key, font, 0)
+        return font
+
+    def _get(self, key: Hashable) -> Any:
+        asset = self._assets.get(key)
+        if asset is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self._hold(key, asset)
+        return asset
+
+    def _add(self, key: Hashable, asset: Any, nbytes: int):
+        self._assets[key] = asset
+        self._sizes[key] = nbytes
+        self.stats.entries += 1
+        self.stats.nbytes += nbytes
+        self._finalizers[key] = weakref.finalize(asset, self._forget, key)
+        self._hold(key, asset)
+
+    def _hold(self, key: Hashable, asset: Any):
+        self._scopes.setdefault(self.current_scope, {})[key] = asset
+
+    def _forget(self, key: Hashable):
+        self._finalizers.pop(key, None)
+        nbytes = self._sizes.pop(key, 0)
+        self.stats.entries -= 1
+        self.stats.nbytes -= nbytes
+
+    def scope_size(self, name: Hashable) -> int:
+        """Returns the combined size in bytes of the assets held by a scope"""
+        return sum(self._sizes.get(key, 0) for key in self._scopes.get(name, ()))
+
+    def scopes(self) -> Dict[Hashable, Set[Hashable]]:
+        """Returns the keys of the assets held by each scope"""
+        return {name: set(held) for name, held in self._scopes.items()}
+
+
+def resource_path(path: str | os.PathLike) -> pathlib.PurePath:
+    """Returns the normalized path of a file in the resource directory"""
+    return utils.normalize_path_str(_conf.GAME.resource_dir / path)
+
+
+def _image_key(path: str | os.PathLike, convert_alpha: bool) -> Hashable:
+    return ("image", resource_path(path), convert_alpha)
+
+
+def _font_key(path: str | os.PathLike, size: int) -> Hashable:
+    return ("font", resource_path(path), size)
+
+
+registry = AssetRegistry()
+
+metrics.registry.gauge("assets.entries", lambda: registry.stats.entries)
+metrics.registry.gauge("assets.size", lambda: registry.stats.nbytes / 1024, "{:.0f}KB")
+
+
+__all__ = [
+    "GLOBAL_SCOPE",
+    "AssetStats",
+    "AssetRegistry",
+    "registry",
+    "resource_path",
+]
@@ -0,0 +1,282 @@
+import dataclasses
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import pygame
+
+from . import game, metrics, profiler, scenes
+
+# events to post before each frame, either as a mapping of frame number
+# to events or as a function taking a frame number and returning events
+EventScript = (
+    Mapping[int, Sequence[pygame.event.Event]]
+    | Callable[[int], Iterable[pygame.event.Event]]
+)
+
+
+def use_dummy_display():
+    """Selects the SDL dummy video and audio drivers
+
+    Must be called before pygame (or core.init()) initializes the display.
+    """
+    if pygame.display.get_init() and pygame.display.get_driver() != "dummy":
+        raise pygame.error("Display already initialized with a real video driver")
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchResult:
+    name: str
+    iterations: int
+    seconds: float
+    # timing statistics in milliseconds for each measured phase
+    phases: Dict[str, Dict[str, float]]
+    # memory blocks still allocated after each iteration, on average
+    retained_blocks: float
+    # peak memory allocated while running, over what was allocated before
+    peak_bytes: int
+
+    @property
+    def rate(self) -> float:
+        """Iterations per second"""
+        return self.iterations / self.seconds if self.seconds else 0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.name}: {self.iterations} iterations in {self.seconds:.3f}s"
+            f" ({self.rate:.1f}/s)"
+        ]
+        for phase, stats in self.phases.items():
+            values = " ".join(f"{k} {v:.3f}" for k, v in stats.items())
+            lines.append(f"  {phase:<8} {values} ms")
+        lines.append(
+            f"  allocs   {self.retained_blocks:.1f} blocks retained/iteration,"
+            f" peak {self.peak_bytes / 1024:.1f}KB"
+        )
+        return "\n".join(lines)
+
+
+class EmptyScene(scenes.Scene):
+    """Scene that draws nothing, used as the base for benchmarked scenes"""
+
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
+        return []
+
+    def handle_event(self, event: pygame.event.Event):
+        pass
+
+    def update(self, dt: float):
+        pass
+
+    def dirty_all_sprites(self):
+        pass
+
+
+class _FixedClock:
+    """Stands in for pygame.time.Clock so every frame advances by the same time"""
+
+    def __init__(self, dt: float):
+        self.ms = dt * 1000
+
+    def tick(self, framerate: int = 0) -> float:
+        return self.ms
+
+    def get_fps(self) -> float:
+        return 1000 / self.ms if self.ms else 0
+
+
+def _script(events: EventScript | None) -> Callable[[int], Iterable[Any]]:
+    if events is None:
+        return lambda frame: ()
+    if callable(events):
+        return events
+    return lambda frame: events.get(frame, ())
+
+
+def _trace_allocations(fn: Callable[[int], Any], iterations: int) -> Tuple[float, int]:
+    if iterations <= 0:
+        return 0, 0
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for i in range(iterations):
+            fn(i)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    stats = after.filter_traces(ignore).compare_to(
+        before.filter_traces(ignore), "lineno"
+    )
+    retained = sum(s.count_diff for s in stats if s.count_diff > 0)
+    return retained / iterations, max(peak, 0)
+
+
+def run_scene(
+    scene_factory: Callable[[game.Game], scenes.Scene],
+    frames: int = 1000,
+    settings: game.GameSettings | None = None,
+    events: EventScript | None = None,
+    dt: float = 1 / 60,
+    warmup: int = 10,
+    alloc_frames: int = 100,
+    name: str | None = None,
+) -> BenchResult:
+    """Runs frames of a scene as fast as possible and reports timings
+
+    Frames are run through the full game loop (events, update, draw, scaling
+    and display update) with the frame rate cap disabled. Every frame advances
+    the game by a fixed dt so results don't depend on the speed of the machine.
+    Allocations are measured in a separate run after the timed frames, as
+    tracing allocations slows everything down.
+
+    The display must use the dummy driver; see use_dummy_display().
+
+    Args:
+        scene_factory (Callable[[game.Game], scenes.Scene]): creates the scene
+            to benchmark. overlays are run on top of an empty scene
+        frames (int): number of frames to time
+        settings (game.GameSettings | None): game settings. defaults to a
+            640x480 window with no scaling
+        events (EventScript | None): events to post before each frame
+        dt (float): seconds of game time per frame
+        warmup (int): frames to run before timing
+        alloc_frames (int): frames to run while tracing allocations
+        name (str | None): benchmark name, defaults to the scene class name
+
+    Returns:
+        BenchResult: timings for each phase of the game loop
+    """
+    if pygame.display.get_driver() != "dummy":
+        raise pygame.error("Benchmarks must run with the dummy video driver")
+    if settings is None:
+        settings = game.GameSettings(640, 480, 640, 480, False)
+    settings = dataclasses.replace(
+        settings, framerate=0, profile=True, profile_frames=frames, metrics_file=None
+    )
+
+    g = game.Game(settings)
+    g.clock = _FixedClock(dt)  # type: ignore
+    try:
+        g.start(EmptyScene(g.draw_surface))
+        scene = scene_factory(g)
+        scenes.new_scene(scene)
+
+        script = _script(events)
+        frame_no = 0
+
+        def frame(_=None):
+            nonlocal frame_no
+            for event in script(frame_no):
+                pygame.event.post(event)
+            frame_no += 1
+            g.step()
+
+        for _ in range(warmup):
+            frame()
+
+        g.profiler = profiler.FrameProfiler(frames)
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame()
+            if not g.running:
+                break
+        seconds = time.perf_counter() - start
+        timed_frames, phases = g.profiler.frames, g.profiler.summary()
+
+        retained, peak = _trace_allocations(frame, alloc_frames)
+    finally:
+        # end the scenes and stop background threads, but keep pygame
+        # initialized for further runs
+        g.stop(quit_pygame=False)
+
+    return BenchResult(
+        name=name or type(scene).__name__,
+        iterations=timed_frames,
+        seconds=seconds,
+        phases=phases,
+        retained_blocks=retained,
+        peak_bytes=peak,
+    )
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    iterations: int = 100,
+    warmup: int = 1,
+    alloc_iterations: int = 10,
+) -> BenchResult:
+    """Times repeated calls to a function, eg. loading assets
+
+    Args:
+        name (str): benchmark name
+        fn (Callable[[], Any]): function to time
+        iterations (int): number of calls to time
+        warmup (int): calls to make before timing
+        alloc_iterations (int): calls to make while tracing allocations
+
+    Returns:
+        BenchResult: timings for each call
+    """
+    for _ in range(warmup):
+        fn()
+
+    timer = metrics.Timer(name, window=iterations)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with timer.time():
+            fn()
+    seconds = time.perf_counter() - start
+
+    retained, peak = _trace_allocations(lambda _: fn(), alloc_iterations)
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        seconds=seconds,
+        phases={"call": timer.value()},
+        retained_blocks=retained,
+        peak_bytes=peak,
+    )
+
+
+def keypress(key: int, mod: int = pygame.KMOD_NONE) -> List[pygame.event.Event]:
+    """Returns events for pressing and releasing a key"""
+    return [
+        pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod, unicode="", scancode=0),
+        pygame.event.Event(pygame.KEYUP, key=key, mod=mod, unicode="", scancode=0),
+    ]
+
+
+def mouse_move(pos: Tuple[int, int]) -> pygame.event.Event:
+    return pygame.event.Event(
+        pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)
+    )
+
+
+def click(pos: Tuple[int, int], button: int = pygame.BUTTON_LEFT) -> List[Any]:
+    """Returns events for clicking a mouse button at a position"""
+    return [
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=button),
+        pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=button),
+    ]
+
+
+__all__ = [
+    "EventScript",
+    "BenchResult",
+    "EmptyScene",
+    "use_dummy_display",
+    "run_scene",
+    "measure",
+    "keypress",
+    "mouse_move",
+    "click",
+]
@@ -2,6 +2,41 @@
 
 DEFAULT_FRAMERATE = 60
 
+# maximum number of fixed timestep updates to run in a single frame
+DEFAULT_MAX_CATCHUP_STEPS = 5
+
+# number of recent frames kept by the frame profiler
+DEFAULT_PROFILE_FRAMES = 600
+
+# number of recent observations kept by metrics histograms
+DEFAULT_METRICS_WINDOW = 256
+
+# seconds between metrics snapshots written to an export file
+DEFAULT_METRICS_EXPORT_INTERVAL = 1.0
+
+# maximum number of threads used to load assets in the background
+DEFAULT_PRELOAD_WORKERS = 4
+
+# seconds per frame to spend finishing preloaded assets on the main thread
+DEFAULT_PRELOAD_FRAME_BUDGET = 0.004
+
+# maximum combined size of assets held by cached Loadable instances, in bytes
+DEFAULT_LOADABLE_CACHE_SIZE = 64 * 1024**2  # 64MB
+
+# seconds to wait for further changes before saving user settings
+DEFAULT_SETTINGS_SAVE_DELAY = 0.5
+
+# seconds between scans of the resource directory for changed files when
+# hot reloading is enabled
+DEFAULT_HOT_RELOAD_INTERVAL = 0.25
+
+# save data files are stored in this directory in the game data directory
+SAVE_DATA_DIR = "saves"
+
+# bytes of replaced chunks a save data file can hold before it's rewritten
+# rather than appended to, if replaced chunks also outweigh live ones
+SAVE_DATA_MIN_DEAD = 1024**2  # 1MB
+
 ### TEXT
 
 # number of seconds to keep typewriter text
@@ -12,3 +47,24 @@ DEFAULT_TYPEWRITER_KEEPALIVE = 3
 # with 0 displaying the entire text at once
 DEFAULT_TEXT_SPEED = 3
 MAX_TEXT_SPEED = 5
+
+# maximum combined size of cached text surfaces, in bytes
+DEFAULT_TEXT_CACHE_SIZE = 16 * 1024**2  # 16MB
+
+# number of word widths to remember per font when wrapping text
+WORD_WIDTH_CACHE_SIZE = 4096
+
+# number of wrapped text layouts to keep
+TEXT_LAYOUT_CACHE_SIZE = 256
+
+# characters typed per second for each level of text speed
+TEXT_SPEED_CHARS_PER_SECOND = 6
+
+# longest frame time in seconds that typewriter text will catch up on,
+# so a stalled frame doesn't dump a whole block of text at once
+MAX_TYPEWRITER_CATCHUP = 0.25
+
+### SPRITES
+
+# number of released sprites a sprite pool keeps for reuse
+DEFAULT_SPRITE_POOL_SIZE = 256
@@ -1,18 +1,72 @@
 import dataclasses
-import itertools
 from typing import Any, Dict, List, Type
 
 import pygame
 
-from . import scenes, text
+from . import metrics, scenes, text, types
 
 
 @dataclasses.dataclass(frozen=True)
 class DiagnosticsSettings(text.TextOptions):
     margins: text.Margins = dataclasses.field(default_factory=text.Margins)
+    # changed values are drawn over the previous ones, so without an opaque
+    # background the old text shows through
+    bg_color: types.ColorValue | None = "black"
+    # diagnostic values change most frames, so don't cache them by default
+    cached: bool = False
+    # times per second to refresh displayed values. 0 refreshes every frame
+    refresh_rate: float = 4
+
+
+class _MetricSprite(pygame.sprite.DirtySprite):
+    """Sprite showing a single diagnostic value
+
+    The value is only re-rendered when its text changes. The image only ever
+    grows, so a shorter value drawn with a background color covers up the
+    previous one.
+    """
+
+    def __init__(self, settings: DiagnosticsSettings):
+        super().__init__()
+        self.settings = settings
+        self.text: str | None = None
+        self.image = pygame.Surface((0, 0), pygame.SRCALPHA)
+        self.rect = self.image.get_rect()
+        # area of the screen the sprite was last drawn to
+        self.drawn_rect: pygame.Rect | None = None
+
+    def set_text(self, value: str):
+        if value == self.text:
+            return
+        self.text = value
+        rendered = text.render_text(value, self.settings)
+        w, h = self.image.get_size()
+        size = (max(w, rendered.get_width()), max(h, rendered.get_height()))
+        if size != (w, h):
+            self.image = pygame.Surface(size, pygame.SRCALPHA)
+            self.rect.size = size
+
+        if self.settings.bg_color is not None:
+            self.image.fill(self.settings.bg_color)
+            self.image.blit(rendered, (0, 0))
+        else:
+            # adding onto a cleared image copies the rendered text's alpha
+            # as is rather than blending it
+            self.image.fill((0, 0, 0, 0))
+            self.image.blit(rendered, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        self.dirty = 1
 
 
 class Diagnostics(scenes.Overlay):
+    """Overlay showing diagnostic values on top of the active scene
+
+    Shows every metric in the metrics registry, along with any values added
+    with add(). Each value has its own sprite that's only re-rendered when
+    the value's text changes, and values are refreshed at most refresh_rate
+    times per second. Only sprites that changed, or that the scene below
+    drew over, are redrawn. Values that stop being tracked are removed, and
+    the scene below is redrawn where they were shown.
+    """
 
     settings_type: Type[DiagnosticsSettings] = DiagnosticsSettings
 
@@ -24,6 +78,14 @@ class Diagnostics(scenes.Overlay):
         if self.settings.margins:
             self.rect = self.settings.margins.apply(self.rect)
         self.draw_group = pygame.sprite.LayeredUpdates()
+        self._sprites: Dict[str, _MetricSprite] = {}
+        # areas of removed sprites that the scene below has to draw over
+        self._cleared: List[pygame.Rect] = []
+        self._refresh_in = 0.0
+
+    def _on_enter(self):
+        super()._on_enter()
+        self.dirty_all_sprites()
 
     def add(self, name: str, value: Any):
         self.diagnostics[name] = value
@@ -37,25 +99,72 @@ class Diagnostics(scenes.Overlay):
 
     def update(self, dt: float):
         super().update(dt)
-        self.draw_group.empty()
-        self._create_diag_sprites()
-        self.draw_group.update()
-
-    def _create_diag_sprites(self):
-        diag_strings = "\n".join([f"{k}: {v}" for k, v in self.diagnostics.items()])
-        lines_per_block = self.rect.h // self.settings.font.get_linesize()
-        text_cols = itertools.batched(diag_strings, lines_per_block)
-
+        self._refresh_in -= dt
+        if self._refresh_in > 0:
+            return
+        if self.settings.refresh_rate > 0:
+            self._refresh_in = 1 / self.settings.refresh_rate
+        self._update_diag_sprites()
+
+    def _update_diag_sprites(self):
+        diags = {**metrics.registry.formatted(), **self.diagnostics}
+        for name, value in diags.items():
+            sprite = self._sprites.get(name)
+            if sprite is None:
+                sprite = self._sprites[name] = _MetricSprite(self.settings)
+                self.draw_group.add(sprite)
+            sprite.set_text(f"{name}: {value}")
+        # drop values that were unregistered since the last refresh
+        for name in [name for name in self._sprites if name not in diags]:
+            sprite = self._sprites.pop(name)
+            self.draw_group.remove(sprite)
+            if sprite.drawn_rect is not None:
+                self._cleared.append(sprite.drawn_rect)
+        self._layout()
+
+    def _layout(self):
+        # arrange values in columns of as many lines as fit in the overlay
+        line_height = self.settings.font.get_linesize()
+        lines_per_col = max(self.rect.h // line_height, 1)
         x, y = self.rect.topleft
-
-        for col in text_cols:
-            col_rect = pygame.Rect(x, y, self.rect.w - x, self.rect.h)
-            diags = text.multiline_text("\n".join(col), self.settings, col_rect)
-            x += max(*diags, key=lambda d: d.rect.w).rect.w
-            self.draw_group.add(*diags)
-
-    def draw(self) -> List[pygame.Rect]:
-        return super().draw() + self.draw_group.draw(self.screen)
+        col_w = 0
+        for i, sprite in enumerate(self._sprites.values()):
+            if i and i % lines_per_col == 0:
+                x += col_w
+                col_w = 0
+            pos = (x, y + (i % lines_per_col) * line_height)
+            if sprite.rect.topleft != pos:
+                sprite.rect.topleft = pos
+                sprite.dirty = 1
+            col_w = max(col_w, sprite.rect.w)
+
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
+        cleared, self._cleared = self._cleared, []
+        # values moved by the layout leave their old area uncovered too
+        for sprite in self.draw_group:
+            drawn = sprite.drawn_rect
+            if drawn is not None and not sprite.rect.contains(drawn):
+                cleared.append(drawn)
+        if cleared:
+            # scenes only draw their background when entered, so restore it
+            # and have the scene draw its sprites over it again
+            scene = self._active_scene
+            for rect in cleared:
+                self.screen.blit(scene.background, rect, rect)
+            scene.dirty_all_sprites()
+
+        # values over cleared areas are redrawn like those the scene drew over
+        below = super().draw(alpha) + cleared
+        changed = []
+        for sprite in self.draw_group:
+            if sprite.dirty or sprite.rect.collidelist(below) != -1:
+                self.screen.blit(sprite.image, sprite.rect)
+                sprite.dirty = 0
+                sprite.drawn_rect = sprite.rect.copy()
+                changed.append(sprite.rect.copy())
+        return below + changed
 
     def dirty_all_sprites(self):
         super().dirty_all_sprites()
+        for sprite in self.draw_group:
+            sprite.dirty = 1
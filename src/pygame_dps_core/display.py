@@ -0,0 +1,232 @@
+import enum
+import math
+from typing import Sequence
+
+import pygame
+
+from . import types
+from .logs import logger
+
+
+class ScaleMode(enum.Enum):
+    # nearest neighbour scaling to the largest size that fits the window
+    NEAREST = "nearest"
+    # nearest neighbour scaling by whole-number factors only. the cheapest
+    # mode, and pixel art stays exact. falls back to fractional scaling if
+    # the window is smaller than the game
+    INTEGER = "integer"
+    # bilinear scaling, better suited to high resolution art. more expensive
+    # than nearest neighbour, and always scales the full frame
+    SMOOTH = "smooth"
+    # draw scenes directly to the display without an intermediate surface.
+    # only possible when the game and screen sizes match
+    NATIVE = "native"
+
+
+class Presenter:
+    """Scales the game draw surface to fit the window and updates the display
+
+    The scale factor and destination area are computed once per window size
+    in rescale() rather than every frame. The draw surface is scaled straight
+    into the display surface where the formats allow, so presenting a frame
+    doesn't allocate a new screen-sized surface.
+
+    Given the dirty rects returned by a scene, only those regions are scaled
+    and pushed to the display. At whole-number scale factors each region is
+    scaled on its own, which gives the same pixels as scaling the full frame.
+    Fractional scale factors can round differently when scaling part of the
+    surface, so the full frame is scaled and only the dirty regions pushed.
+
+    Args:
+        screen (pygame.Surface): the display surface
+        draw_surface (pygame.Surface): surface scenes are drawn to. in native
+            mode, this must be the display surface
+        mode (ScaleMode): scaling strategy
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        draw_surface: pygame.Surface,
+        mode: ScaleMode = ScaleMode.NEAREST,
+    ):
+        if mode is ScaleMode.NATIVE and draw_surface is not screen:
+            raise pygame.error("Native scaling requires drawing to the display")
+        if mode is ScaleMode.SMOOTH and draw_surface.get_bitsize() not in (24, 32):
+            logger.warning("Smooth scaling needs a 24 or 32 bit surface; using nearest")
+            mode = ScaleMode.NEAREST
+
+        self.screen = screen
+        self.draw_surface = draw_surface
+        self.mode = mode
+        self.scale_factor = 1.0
+        self.rect = draw_surface.get_rect()
+        self._integer_scale = True
+        self._dest = screen
+        # if the draw surface and display formats differ, scale
+        # into a buffer in the draw surface format and blit it
+        self._buffer: pygame.Surface | None = None
+        self._full_redraw = True
+        self.rescale()
+
+    def rescale(self):
+        """Recomputes the scale factor and output area for the window size"""
+        self._full_redraw = True
+        if self.mode is ScaleMode.NATIVE:
+            # the window can't be resized in native mode, so there's no
+            # scale to compute and nothing to copy when presenting
+            return
+
+        game_w, game_h = self.draw_surface.get_size()
+        screen_w, screen_h = self.screen.get_size()
+        self.scale_factor = min(screen_w / game_w, screen_h / game_h)
+        if self.mode is ScaleMode.INTEGER and self.scale_factor >= 1:
+            self.scale_factor = float(math.floor(self.scale_factor))
+        self._integer_scale = self.scale_factor.is_integer()
+
+        size = (int(game_w * self.scale_factor), int(game_h * self.scale_factor))
+        self.rect = pygame.Rect((0, 0), size)
+        self.rect.center = self.screen.get_rect().center
+
+        # clear the letterbox area around the scaled output
+        self.screen.fill((0, 0, 0))
+        self._dest = self.screen.subsurface(self.rect)
+        self._buffer = None
+        if not _same_format(self.draw_surface, self._dest):
+            self._buffer = pygame.Surface(size, 0, self.draw_surface)
+
+    @property
+    def path(self) -> str:
+        """Describes how frames are presented, for diagnostics"""
+        if self.mode is ScaleMode.NATIVE:
+            return ScaleMode.NATIVE.value
+        path = f"{self.mode.value} x{self.scale_factor:.2f}"
+        if self.scale_factor == 1:
+            path = "blit x1"
+        if self._buffer is not None:
+            path += " (buffered)"
+        return path
+
+    def invalidate(self):
+        """Presents the whole frame on the next call to present()"""
+        self._full_redraw = True
+
+    def present(self, dirty: Sequence[pygame.Rect] | None = None):
+        """Scales the draw surface to the display and updates the window
+
+        Args:
+            dirty (Sequence[pygame.Rect] | None): changed areas of the draw
+                surface. if None, the whole frame is presented
+        """
+        self.flip(self.scale(dirty))
+
+    def scale(
+        self, dirty: Sequence[pygame.Rect] | None = None
+    ) -> Sequence[pygame.Rect] | None:
+        """Scales the changed areas of the draw surface to the display
+
+        Args:
+            dirty (Sequence[pygame.Rect] | None): changed areas of the draw
+                surface. if None, the whole frame is scaled
+
+        Returns:
+            Sequence[pygame.Rect] | None: areas of the window to pass to
+                flip(), or None to update the whole window
+        """
+        full_redraw = self._full_redraw
+        self._full_redraw = False
+        if self.mode is ScaleMode.NATIVE:
+            # scenes drew straight to the display, so there's nothing to scale
+            return None if full_redraw or dirty is None else dirty
+
+        if full_redraw or dirty is None:
+            self._scale(self.draw_surface.get_rect())
+            # update the whole window after a rescale to include the letterbox
+            return None if full_redraw else [self.rect]
+
+        bounds = self.draw_surface.get_rect()
+        regions = [r for r in (bounds.clip(d) for d in dirty) if r.w and r.h]
+        if not regions:
+            return []
+
+        if self._integer_scale and self.mode is not ScaleMode.SMOOTH:
+            return [self._scale(r) for r in regions]
+
+        self._scale(bounds)
+        updated = [self._map_rect(r) for r in regions]
+        if self.mode is ScaleMode.SMOOTH:
+            # bilinear filtering blends in neighbouring pixels
+            pad = math.ceil(self.scale_factor)
+            updated = [r.inflate(pad * 2, pad * 2).clip(self.rect) for r in updated]
+        return updated
+
+    def flip(self, updated: Sequence[pygame.Rect] | None):
+        """Pushes the given areas of the display to the window
+
+        Args:
+            updated (Sequence[pygame.Rect] | None): areas returned by scale()
+        """
+        if updated is None:
+            pygame.display.update()
+        elif updated:
+            pygame.display.update(updated)
+
+    def _scale(self, region: pygame.Rect) -> pygame.Rect:
+        """Scales a region of the draw surface, returning the screen area"""
+        dest_rect = self._map_rect(region).move(-self.rect.x, -self.rect.y)
+        src = self.draw_surface
+        if region != src.get_rect():
+            src = src.subsurface(region)
+
+        if self._buffer is not None:
+            self._scale_into(src, self._buffer, dest_rect)
+            self._dest.blit(self._buffer, dest_rect, dest_rect)
+        else:
+            self._scale_into(src, self._dest, dest_rect)
+        return dest_rect.move(self.rect.topleft)
+
+    def _scale_into(
+        self, src: pygame.Surface, dest: pygame.Surface, dest_rect: pygame.Rect
+    ):
+        if self.scale_factor == 1:
+            dest.blit(src, dest_rect)
+            return
+        if dest_rect != dest.get_rect():
+            dest = dest.subsurface(dest_rect)
+        if self.mode is ScaleMode.SMOOTH:
+            pygame.transform.smoothscale(src, dest_rect.size, dest)
+        else:
+            pygame.transform.scale(src, dest_rect.size, dest)
+
+    def _map_rect(self, region: pygame.Rect) -> pygame.Rect:
+        """Maps a rect on the draw surface to the screen"""
+        sf = self.scale_factor
+        if self._integer_scale:
+            k = int(sf)
+            rect = pygame.Rect(region.x * k, region.y * k, region.w * k, region.h * k)
+        elif region == self.draw_surface.get_rect():
+            rect = pygame.Rect((0, 0), self.rect.size)
+        else:
+            left, top = math.floor(region.x * sf), math.floor(region.y * sf)
+            right, bottom = math.ceil(region.right * sf), math.ceil(region.bottom * sf)
+            rect = pygame.Rect(left, top, right - left, bottom - top)
+            rect = rect.clip(pygame.Rect((0, 0), self.rect.size))
+        return rect.move(self.rect.topleft)
+
+    def scale_pos(self, pos: types.Coordinate) -> types.Coordinate:
+        """Maps a position in the window to the draw surface"""
+        x, y = pos
+        return (
+            (x - self.rect.x) / self.scale_factor,
+            (y - self.rect.y) / self.scale_factor,
+        )
+
+
+def _same_format(a: pygame.Surface, b: pygame.Surface) -> bool:
+    return a.get_bitsize() == b.get_bitsize() and a.get_masks() == b.get_masks()
+
+
+__all__ = [
+    "ScaleMode",
+    "Presenter",
+]
@@ -1,11 +1,23 @@
 import collections
 import dataclasses
-from typing import Dict, Type
+from typing import Dict, List, Tuple, Type
 
 import pygame
 
-from . import _conf, const, io, scenes, types
+from . import (
+    _conf,
+    const,
+    display,
+    hotreload,
+    io,
+    metrics,
+    profiler,
+    scenes,
+    text,
+    types,
+)
 from .keys import KeyBinding, key
+from .logs import logger
 
 
 @dataclasses.dataclass(frozen=True)
@@ -17,10 +29,40 @@ class GameSettings(io.Configurable):
     screen_height: int
     fullscreen: bool
     framerate: int = const.DEFAULT_FRAMERATE
+    # seconds of simulation per update. if set, scenes are updated in fixed
+    # steps independent of the frame rate and drawn with an interpolation
+    # alpha. 0 updates once per frame with the elapsed time
+    fixed_timestep: float = 0
+    # most fixed steps to run in one frame before dropping the backlog
+    max_catchup_steps: int = const.DEFAULT_MAX_CATCHUP_STEPS
+    # skip drawing frames that needed more than one fixed step to catch up
+    skip_draws_when_behind: bool = False
 
     key_map: Dict[str, KeyBinding] = dataclasses.field(default_factory=dict)
     icon: pygame.Surface | None = None
 
+    scale_mode: display.ScaleMode = display.ScaleMode.NEAREST
+
+    text_cache_size: int = const.DEFAULT_TEXT_CACHE_SIZE
+    text_cache_policy: text.CachePolicy = text.CachePolicy.LRU
+    # budget for assets held by scenes and other instances cached by
+    # Loadable.load() that aren't in use. see io.LoadableRegistry
+    loadable_cache_size: int = const.DEFAULT_LOADABLE_CACHE_SIZE
+
+    # record per-frame phase timings. see Game.profiler
+    profile: bool = False
+    profile_frames: int = const.DEFAULT_PROFILE_FRAMES
+
+    # append metrics snapshots to this file in the game data directory.
+    # the format is chosen by extension, either .csv or .jsonl
+    metrics_file: str | None = None
+    metrics_interval: float = const.DEFAULT_METRICS_EXPORT_INTERVAL
+
+    # development mode: apply changes to settings files and assets in the
+    # resource directory while the game runs. see hotreload.HotReloader
+    hot_reload: bool = False
+    hot_reload_interval: float = const.DEFAULT_HOT_RELOAD_INTERVAL
+
 
 class Game(io.Loadable):
     """Game runtime class
@@ -36,7 +78,15 @@ class Game(io.Loadable):
 
     def __init__(self, settings: GameSettings):
         screen_size = (settings.screen_width, settings.screen_height)
-        flags = pygame.RESIZABLE | (settings.fullscreen and pygame.FULLSCREEN)
+        game_size = (settings.game_width, settings.game_height)
+        scale_mode = settings.scale_mode
+        if scale_mode is display.ScaleMode.NATIVE and screen_size != game_size:
+            logger.warning("Native scaling needs matching game and screen sizes")
+            scale_mode = display.ScaleMode.NEAREST
+
+        flags = settings.fullscreen and pygame.FULLSCREEN
+        if scale_mode is not display.ScaleMode.NATIVE:
+            flags |= pygame.RESIZABLE
         self._screen = pygame.display.set_mode(screen_size, flags=flags)
         self.rect = self._screen.get_rect()
 
@@ -45,36 +95,170 @@ class Game(io.Loadable):
             pygame.display.set_icon(settings.icon)
 
         # create a separate draw surface for all scenes to draw to. the draw
-        # surface maintains its size and is scaled to match the screen
-        game_size = (settings.game_width, settings.game_height)
-        self.draw_surface = pygame.Surface(game_size)
+        # surface maintains its size and is scaled to match the screen. in
+        # native mode, scenes draw directly to the display instead
+        if scale_mode is display.ScaleMode.NATIVE:
+            self.draw_surface = self._screen
+        else:
+            self.draw_surface = pygame.Surface(game_size)
+        self.presenter = display.Presenter(self._screen, self.draw_surface, scale_mode)
+        self._presented_scene: scenes.Scene | None = None
 
         self.clock = pygame.time.Clock()
         self.framerate = settings.framerate
 
-        # action strings mapped to key bindings are loaded into a controller
-        key.load_bindings(settings.key_map)
+        self.fixed_timestep = settings.fixed_timestep
+        self.max_catchup_steps = max(settings.max_catchup_steps, 1)
+        self.skip_draws_when_behind = settings.skip_draws_when_behind
+        self._accumulator = 0.0
+        self._alpha = 1.0
+        self._behind = False
+        self._skipped_draws = 0
+
+        self.profiler: profiler.FrameProfiler | None = None
+        if settings.profile:
+            self.profiler = profiler.FrameProfiler(
+                settings.profile_frames, settings.framerate
+            )
+
+        self._frame_time = metrics.registry.timer("frame.dt")
+        self._events = metrics.registry.counter("input.events")
+        self.metrics_exporter: metrics.MetricsExporter | None = None
+        if settings.metrics_file is not None:
+            if _conf.GAME.data_dir is None:
+                logger.warning("No data directory to export metrics to")
+            else:
+                self.metrics_exporter = metrics.MetricsExporter(
+                    _conf.GAME.data_dir / settings.metrics_file,
+                    settings.metrics_interval,
+                )
+
+        self.hot_reloader: hotreload.HotReloader | None = None
+        if settings.hot_reload:
+            self.hot_reloader = hotreload.HotReloader(settings.hot_reload_interval)
+
+        self._configure(settings)
         # keep our own track of key presses on KEYDOWN/KEYUP so that we can set
         # key toggles correctly if repeat is enabled
         self._pressed = collections.defaultdict(bool)
         self._running = False
 
+    def _configure(self, settings: GameSettings):
+        # action strings mapped to key bindings are loaded into a controller
+        key.load_bindings(settings.key_map)
+        text.text_cache.configure(
+            max_bytes=settings.text_cache_size, policy=settings.text_cache_policy
+        )
+        io.registry.configure(max_bytes=settings.loadable_cache_size)
+
+    def reload(self, settings: GameSettings):
+        """Applies changed timing, key binding and cache settings
+
+        Display settings need a restart to change, as scenes keep references
+        to the draw surface.
+        """
+        self.framerate = settings.framerate
+        self.fixed_timestep = settings.fixed_timestep
+        self.max_catchup_steps = max(settings.max_catchup_steps, 1)
+        self.skip_draws_when_behind = settings.skip_draws_when_behind
+        self._configure(settings)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
     def run(self, main_scene: scenes.Scene):
+        self.start(main_scene)
+
+        # profiled frames are kept out of the main loop so that profiling
+        # costs nothing when it's disabled
+        if self.profiler is not None:
+            while self._running:
+                self._step_profiled(self.profiler)
+        else:
+            while self._running:
+                self._handle_events()
+                self._update()
+                self._draw()
+
+        self.stop()
+
+    def start(self, main_scene: scenes.Scene):
+        """Enters the main scene, ready to run frames with step()"""
+        # if loaded with Game.load(), stay cached while the game runs
+        io.registry.acquire(self)
+        metrics.registry.gauge("fps", self._get_fps, "{:.1f}")
+        metrics.registry.gauge("display.scaling", self._get_scaling_path)
         scenes.new_scene(main_scene)
         self._rescale()
         self._running = True
 
-        while self._running:
+    def step(self):
+        """Runs a single frame of the game loop"""
+        if self.profiler is not None:
+            self._step_profiled(self.profiler)
+        else:
             self._handle_events()
             self._update()
             self._draw()
 
-        pygame.quit()
+    def stop(self, quit_pygame: bool = True):
+        """Shuts down the game after the game loop exits
+
+        Args:
+            quit_pygame (bool): uninitialize pygame. pass False to keep using
+                pygame afterwards, eg. to run another game in benchmarks
+        """
+        self._running = False
+        scenes.end_all_scenes()
+        io.registry.release(self)
+        # don't keep the game alive from the global metrics registry, leaving
+        # gauges another game has since taken over alone
+        gauges = {"fps": self._get_fps, "display.scaling": self._get_scaling_path}
+        for name, source in gauges.items():
+            gauge = metrics.registry.get(name)
+            if isinstance(gauge, metrics.Gauge) and gauge.source == source:
+                metrics.registry.unregister(name)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+        if self.hot_reloader is not None:
+            self.hot_reloader.stop()
+        # write settings that are waiting to be saved in the background
+        io.writer.flush()
+        if quit_pygame:
+            pygame.quit()
+
+    # gauge sources look up the clock and presenter when read, as they can be
+    # replaced, eg. with a fixed step clock in benchmarks
+    def _get_fps(self) -> float:
+        return self.clock.get_fps()
+
+    def _get_scaling_path(self) -> str:
+        return self.presenter.path
+
+    def _step_profiled(self, prof: profiler.FrameProfiler):
+        Phase = profiler.Phase
+        prof.begin_frame()
+        self._handle_events()
+        prof.mark(Phase.EVENTS)
+        dt = self._tick()
+        prof.idle()
+        self._advance(dt)
+        prof.mark(Phase.UPDATE)
+        drawn, dirty = self._draw_scene()
+        prof.mark(Phase.DRAW)
+        updated = self.presenter.scale(dirty) if drawn else []
+        prof.mark(Phase.SCALE)
+        self.presenter.flip(updated)
+        prof.mark(Phase.FLIP)
+        prof.end_frame()
 
     def _handle_events(self):
         scene = scenes.get_active_scene()
 
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        self._events.inc(len(events))
+        for event in events:
             # handle system-level events. all events are still passed to the
             # scene in case further processing is needed
             match event.type:
@@ -99,39 +283,73 @@ class Game(io.Loadable):
             scene.handle_event(event)
 
     def _update(self):
-        dt = self.clock.tick(self.framerate) / 1000
+        self._advance(self._tick())
+
+    def _tick(self) -> float:
+        # waits out the rest of the frame to cap the frame rate
+        return self.clock.tick(self.framerate) / 1000
+
+    def _advance(self, dt: float):
+        self._frame_time.record(dt)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.update(dt)
+        if self.hot_reloader is not None:
+            self.hot_reloader.update()
         # run pygame.key.get_pressed() once per tick
         key.update()
-        scenes.get_active_scene().update(dt)
+
+        if not self.fixed_timestep:
+            scenes.get_active_scene().update(dt)
+            return
+
+        step = self.fixed_timestep
+        self._accumulator += dt
+        steps = 0
+        while self._accumulator >= step and steps < self.max_catchup_steps:
+            scenes.get_active_scene().update(step)
+            self._accumulator -= step
+            steps += 1
+
+        if self._accumulator >= step:
+            # still behind after the maximum number of steps. drop the backlog
+            # rather than falling further behind on every frame
+            self._accumulator %= step
+        self._behind = steps > 1
+        self._alpha = self._accumulator / step
 
     def _draw(self):
+        drawn, dirty = self._draw_scene()
+        if drawn:
+            self.presenter.present(dirty)
+
+    def _draw_scene(self) -> Tuple[bool, List[pygame.Rect] | None]:
+        # returns whether the scene was drawn, and the dirty rects if so
         scene = scenes.get_active_scene()
-        scene.draw()
+        if scene is not self._presented_scene:
+            # scenes draw their background when entered, so present the whole
+            # frame on a scene change rather than only the dirty regions
+            self.presenter.invalidate()
+            self._presented_scene = scene
 
-        scale_factor = self.get_scale_factor()
-        scaled = pygame.transform.scale_by(self.draw_surface, scale_factor)
-        scaled_rect = scaled.get_rect()
-        scaled_rect.center = self._screen.get_rect().center
+        if self._behind and self.skip_draws_when_behind:
+            # always draw at least every max_catchup_steps frames
+            if self._skipped_draws < self.max_catchup_steps - 1:
+                self._skipped_draws += 1
+                return False, None
+        self._skipped_draws = 0
 
-        self._screen.blit(scaled, scaled_rect)
-        pygame.display.update(scaled_rect)
+        if self.fixed_timestep:
+            return True, scene.draw(self._alpha)
+        return True, scene.draw()
 
     def _rescale(self):
         self.rect = self._screen.get_rect()
+        self.presenter.rescale()
         # mark all sprites in the scene dirty so everything gets redrawn on resize
         scenes.get_active_scene().dirty_all_sprites()
-        pygame.display.update()
 
     def _scale_pos(self, pos: types.Coordinate) -> types.Coordinate:
-        x, y = pos
-        scale_factor = self.get_scale_factor()
-        w, h = self.draw_surface.get_size()
-        x_offset = (self._screen.get_width() - (w * scale_factor)) / 2
-        y_offset = (self._screen.get_height() - (h * scale_factor)) / 2
-        return ((x - x_offset) / scale_factor, (y - y_offset) / scale_factor)
+        return self.presenter.scale_pos(pos)
 
     def get_scale_factor(self) -> float:
-        game_width, game_height = self.draw_surface.get_size()
-        width_scale = self._screen.get_width() / game_width
-        height_scale = self._screen.get_height() / game_height
-        return min(width_scale, height_scale)
+        return self.presenter.scale_factor
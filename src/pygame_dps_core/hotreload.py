@@ -0,0 +1,189 @@
+import os
+import pathlib
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Set, Tuple
+
+from . import _conf, assets, const, io, layout, metrics, scenes, text, utils
+from .logs import logger
+
+SETTINGS_SUFFIXES = frozenset((".yml", ".yaml"))
+
+# modification time and size of a file
+_Stamp = Tuple[int, int]
+
+
+class FileWatcher:
+    """Polls a directory tree for changed files on a background thread
+
+    Changes are collected until changes() is called, eg. once per frame on the
+    main thread. Files that change several times between calls are only
+    reported once.
+
+    Args:
+        root (str | os.PathLike): directory to watch
+        interval (float): seconds between scans of the directory
+    """
+
+    def __init__(self, root: str | os.PathLike, interval: float):
+        self.root = pathlib.Path(root)
+        self.interval = interval
+        self._stamps = self._scan()
+        self._changes: queue.SimpleQueue[Tuple[pathlib.Path, int]] = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="hot-reload", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def changes(self) -> Dict[pathlib.Path, int]:
+        """Returns changed files with their modification times in nanoseconds"""
+        changed = {}
+        while True:
+            try:
+                path, mtime_ns = self._changes.get_nowait()
+            except queue.Empty:
+                return changed
+            changed[path] = mtime_ns
+
+    def _scan(self) -> Dict[pathlib.Path, _Stamp]:
+        stamps = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = pathlib.Path(dirpath, filename)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    # deleted since it was listed
+                    continue
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamps = self._scan()
+            for path, stamp in stamps.items():
+                if self._stamps.get(path) != stamp:
+                    self._changes.put((path, stamp[0]))
+            self._stamps = stamps
+
+
+class HotReloader:
+    """Applies changes to files in the resource directory while the game runs
+
+    A development aid: watches the resource directory for changed files, and
+    on the main thread (see update()):
+
+    - forgets changed images and fonts in the asset registry, along with text
+      rendered with changed fonts
+    - reads changed settings files again, keeping user settings
+    - passes the new settings to instances loaded from changed settings files,
+      or from settings that refer to changed images or fonts, with
+      Loadable.reload()
+
+    The time from a file being saved to the change being applied is recorded
+    in the hot_reload.latency metric.
+
+    Args:
+        interval (float): seconds between scans of the resource directory
+    """
+
+    def __init__(self, interval: float = const.DEFAULT_HOT_RELOAD_INTERVAL):
+        self.watcher = FileWatcher(_conf.GAME.resource_dir, interval)
+        self.latency = metrics.registry.timer("hot_reload.latency")
+        self.reloads = metrics.registry.counter("hot_reload.files")
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.stop()
+
+    def update(self):
+        """Applies changes found since the last update"""
+        changes = self.watcher.changes()
+        if not changes:
+            return
+
+        changed = {utils.normalize_path_str(path) for path in changes}
+        changed_assets = {
+            path for path in changed if path.suffix.lower() not in SETTINGS_SUFFIXES
+        }
+        # forget stale assets first, so that reloaded settings decode them again
+        for path in changed_assets:
+            _invalidate_asset(path)
+
+        reload_paths = changed & io.registry.settings.keys()
+        if changed_assets:
+            names = {_resource_name(path) for path in changed_assets}
+            for filepath, settings in io.registry.settings.items():
+                if _references(settings.values, names):
+                    reload_paths.add(filepath)
+
+        reloaded_files = 0
+        for filepath in reload_paths:
+            try:
+                reloaded = io.registry.reload(filepath)
+            except Exception as e:
+                # eg. a half-written file. it will be reloaded when it's saved
+                logger.error("Failed to reload %s: %s", filepath, e)
+                continue
+            reloaded_files += 1
+            for o in reloaded:
+                if isinstance(o, scenes.Scene):
+                    o.dirty_all_sprites()
+
+        self.reloads.inc(len(changed))
+        # measured from the newest change, as earlier ones may have been
+        # waiting on a later write to the same set of files
+        latency = time.time() - max(changes.values()) / 1e9
+        self.latency.record(latency)
+        logger.info(
+            "Applied %d changed files (%d settings files reloaded) in %.0fms",
+            len(changed),
+            reloaded_files,
+            latency * 1000,
+        )
+
+
+def _invalidate_asset(path: pathlib.PurePath):
+    fonts = [font for font, file in io.font_files.items() if file == path]
+    for font in fonts:
+        text.text_cache.clear(font)
+    if fonts:
+        layout.clear_caches()
+    assets.registry.invalidate(path)
+
+
+def _resource_name(path: pathlib.PurePath) -> pathlib.PurePath:
+    resource_dir = utils.normalize_path_str(_conf.GAME.resource_dir)
+    try:
+        return path.relative_to(resource_dir)
+    except ValueError:
+        return path
+
+
+def _references(data: Any, names: Set[pathlib.PurePath]) -> bool:
+    """Returns whether parsed settings name any of the given files"""
+    if isinstance(data, str):
+        # fonts are given as "file, size"
+        return utils.normalize_path_str(data.split(",")[0].strip()) in names
+    if isinstance(data, dict):
+        return _any_references(data.values(), names)
+    if isinstance(data, list):
+        return _any_references(data, names)
+    return False
+
+
+def _any_references(values: Iterable[Any], names: Set[pathlib.PurePath]) -> bool:
+    return any(_references(v, names) for v in values)
+
+
+__all__ = [
+    "FileWatcher",
+    "HotReloader",
+]
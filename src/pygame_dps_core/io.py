@@ -1,18 +1,64 @@
+import collections
+import contextlib
+import contextvars
+import copy
 import dataclasses
 import enum
+import hashlib
+import marshal
+import os
 import pathlib
+import sys
+import threading
+import time
+import weakref
 from inspect import isclass
 from types import UnionType
-from typing import Any, Protocol, Type, TypeVar, Union, get_args, get_origin
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Protocol,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 import pygame
 import yaml
 
-from . import _conf, utils
+from . import _conf, assets, const, metrics, utils
 from .logs import logger
 
+# use the libyaml bindings where PyYAML was built with them
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader  # type: ignore
+
+# bump to invalidate parsed YAML files in the cache directory
+_YAML_CACHE_VERSION = 1
+
 ConfigurableT_co = TypeVar("ConfigurableT_co", bound="Configurable")
 
+# fonts don't know which file they were loaded from, so keep track of
+# it here for caches that need to be invalidated when the font changes
+font_files: "weakref.WeakKeyDictionary[pygame.font.Font, pathlib.PurePath]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# decodes a raw config value into the type of a settings field
+Decoder = Callable[[Any], Any]
+
 
 # XXX: this whole module uses a lot of reflection magic
 @dataclasses.dataclass(frozen=True)
@@ -23,73 +69,400 @@ class Configurable:
         super().__init__(*args, **kwargs)
 
     @classmethod
-    def from_config(cls: Type[ConfigurableT_co], data: dict) -> ConfigurableT_co:
+    def from_config(
+        cls: Type[ConfigurableT_co], data: dict, lazy: bool | None = None
+    ) -> ConfigurableT_co:
+        """Creates an instance from parsed settings
+
+        Args:
+            data (dict): parsed settings values, keyed by field name
+            lazy (bool | None): defer loading images and fonts until the fields
+                are first accessed, including in nested settings. by default,
+                inherits the mode of the settings being decoded. settings
+                classes decoded lazily can't be dataclasses with slots=True
+
+        Returns:
+            ConfigurableT_co: the decoded settings
+        """
+        if lazy is not None and lazy != _lazy_decoding.get():
+            token = _lazy_decoding.set(lazy)
+            try:
+                return cls.from_config(data)
+            finally:
+                _lazy_decoding.reset(token)
+
         data = data or {}
         params = {}
+        deferred = {}
+        lazy = _lazy_decoding.get()
+
+        for name, decode, heavy in _decoder_plan(cls):
+            if name in data:
+                value = data[name]
+                if lazy and heavy and value is not None:
+                    deferred[name] = _LazyField(
+                        value, decode, assets.registry.current_scope
+                    )
+                    params[name] = None
+                else:
+                    params[name] = decode(value)
+
+        o = cls(**params)
+        if deferred:
+            _install_deferred(cls)
+            # remove the placeholders so that the _Deferred class attributes
+            # load the fields when they're accessed
+            for name in deferred:
+                object.__delattr__(o, name)
+            object.__setattr__(o, "_lazy_fields", deferred)
+        return o
 
-        for field in dataclasses.fields(cls):
-            if field.name in data:
-                value = data[field.name]
-                params[field.name] = cls._unmarshal_field(field.type, value)
 
-        return cls(**params)
+@dataclasses.dataclass(frozen=True)
+class _LazyField:
+    value: Any
+    decode: Decoder
+    scope: Hashable
+
+
+class _Deferred:
+    """Class attribute that loads a deferred settings field on first access
+
+    Decoded values are stored on the instance, which takes precedence over
+    this (non-data) descriptor, so only the first access is slower.
+    """
+
+    def __init__(self, name: str, default: Any = dataclasses.MISSING):
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj: Any, owner: type | None = None) -> Any:
+        if obj is None:
+            if self.default is dataclasses.MISSING:
+                raise AttributeError(self.name)
+            return self.default
+        field: _LazyField = obj.__dict__["_lazy_fields"][self.name]
+        # hold the asset in the scope that loaded the settings, so it's
+        # released with the scene rather than kept for the whole game
+        with assets.registry.scope(field.scope):
+            value = field.decode(field.value)
+        object.__setattr__(obj, self.name, value)
+        return value
 
-    @staticmethod
-    def _unmarshal_field(type_, value) -> Any:
+
+# set while decoding settings in lazy mode, so nested settings are lazy too
+_lazy_decoding: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "lazy_decoding", default=False
+)
+
+# field decoders for each Configurable class, built the first time the class
+# is decoded so type reflection only happens once per class. fields that
+# load images or fonts are flagged so lazy decoding can defer them
+_decoder_plans: "Dict[type, Tuple[Tuple[str, Decoder, bool], ...]]" = {}
+_decoders: Dict[Any, Decoder] = {}
+
+# field types that are expensive to load
+_HEAVY_TYPES = (pygame.Surface, pygame.font.Font)
+
+# classes with _Deferred attributes for their heavy fields
+_lazy_classes: Set[type] = set()
+
+
+def _decoder_plan(cls: type) -> Tuple[Tuple[str, Decoder, bool], ...]:
+    plan = _decoder_plans.get(cls)
+    if plan is None:
+        try:
+            # resolves string annotations and forward references
+            hints = get_type_hints(cls)
+        except (NameError, TypeError):
+            hints = {}
+        plan = []
+        for field in dataclasses.fields(cls):
+            type_ = hints.get(field.name, field.type)
+            plan.append((field.name, _decoder(type_), _is_heavy(type_)))
+        plan = _decoder_plans[cls] = tuple(plan)
+    return plan
+
+
+def _install_deferred(cls: type):
+    # done the first time the class is decoded lazily, so classes that are
+    # only decoded eagerly are left as they are
+    if cls in _lazy_classes:
+        return
+    if "__slots__" in cls.__dict__:
+        raise pygame.error(f"{cls.__name__} can't be decoded lazily, as it uses slots")
+    heavy = {name for name, _, heavy in _decoder_plan(cls) if heavy}
+    for field in dataclasses.fields(cls):
+        if field.name in heavy:
+            setattr(cls, field.name, _Deferred(field.name, field.default))
+    _lazy_classes.add(cls)
+
+
+def _is_heavy(type_: Any) -> bool:
+    # eg. Surface, Font | None, or List[Surface]. nested Configurables aren't
+    # heavy themselves, as their own heavy fields are deferred
+    if type_ in _HEAVY_TYPES:
+        return True
+    return any(_is_heavy(t) for t in get_args(type_))
+
+
+def _decoder(type_: Any) -> Decoder:
+    decoder = _decoders.get(type_)
+    if decoder is None:
+        decoder = _decoders[type_] = _compile_decoder(type_)
+    return decoder
+
+
+def _compile_decoder(type_: Any) -> Decoder:
+    # special case classes to try in order, eg. each member of a union
+    if get_origin(type_) in (Union, UnionType):
+        classes = [t for t in get_args(type_) if isclass(t)]
+    elif isclass(type_):
+        classes = [type_]
+    else:
+        classes = []
+    class_decoders = tuple(
+        d for d in (_class_decoder(t) for t in classes) if d is not None
+    )
+
+    # if the value is a list, expect the field type to be List[T]. similarly,
+    # expect dict values to be typed Dict[K, T]. element decoders are looked
+    # up lazily so recursive types don't recurse when compiling
+    args = getattr(type_, "__args__", None) or ()
+    list_type = args[0] if args else None
+    dict_type = args[1] if len(args) == 2 else None
+
+    def decode(value: Any) -> Any:
         if value is None:
             return None
-
         if isinstance(value, Configurable):
             # if the value is already a Configurable type
             # instance, no need to continue
             return value
-        elif get_origin(type_) in (Union, UnionType):
-            for t in get_args(type_):
-                if isclass(t):
-                    o = Configurable._unmarshal_class(t, value)
-                    if o is not None:
-                        return o
-        elif isclass(type_):
-            instance = Configurable._unmarshal_class(type_, value)
-            if instance is not None:
-                return instance
-
-        # if the value is a list, expect the field type to be List[T]
-        if isinstance(value, list) and hasattr(type_, "__args__"):
-            type_ = type_.__args__[0]
-            return list(Configurable._unmarshal_field(type_, o) for o in value)
-        # similarly, expect dict values to be typed Dict[K, T]
-        elif isinstance(value, dict):
-            if hasattr(type_, "__args__") and len(type_.__args__) == 2:
-                return {
-                    k: Configurable._unmarshal_field(type_.__args__[1], v)
-                    for k, v in value.items()
-                }
+        for decode_class in class_decoders:
+            o = decode_class(value)
+            if o is not None:
+                return o
+        if isinstance(value, list):
+            if list_type is not None:
+                decode_item = _decoder(list_type)
+                return [decode_item(o) for o in value]
+        elif isinstance(value, dict) and dict_type is not None:
+            decode_value = _decoder(dict_type)
+            return {k: decode_value(v) for k, v in value.items()}
         return value
 
-    @staticmethod
-    def _unmarshal_class(type_: type, value: Any) -> Any:
-        # decode logic for special case clases
-        # TODO: validation for values + error handling
-        if issubclass(type_, enum.Enum):
-            return type_(value)
-        elif issubclass(type_, Configurable):
-            return type_.from_config(value)
-        elif type_ is pygame.font.Font:
-            if isinstance(value, str):
-                filename, size = value.replace(" ", "").split(",")
-                file = utils.normalize_path_str(_conf.GAME.resource_dir / filename)
-                return pygame.font.Font(file, int(size))
-            return pygame.font.SysFont(**value)
-        elif type_ is pygame.Surface:
-            img_path = utils.normalize_path_str(_conf.GAME.resource_dir / value)
-            img = pygame.image.load(img_path)
-            # return a version of the image optimized
-            # for blit with pixel alphas preserved
-            return img.convert_alpha()
-        elif type_ is pygame.Rect:
-            return pygame.Rect(*value)
-        return None
+    return decode
+
+
+def _class_decoder(type_: type) -> Decoder | None:
+    # decode logic for special case clases
+    # TODO: validation for values + error handling
+    if issubclass(type_, enum.Enum):
+        return type_
+    elif issubclass(type_, Configurable):
+        return type_.from_config
+    elif type_ is pygame.font.Font:
+        return _load_font
+    elif type_ is pygame.Surface:
+        return _load_image
+    elif type_ is pygame.Rect:
+        return lambda value: pygame.Rect(*value)
+    return None
+
+
+def _load_font(value: Any) -> pygame.font.Font:
+    if isinstance(value, str):
+        filename, size = value.replace(" ", "").split(",")
+        font = assets.registry.font(filename, int(size))
+        font_files[font] = utils.normalize_path_str(_conf.GAME.resource_dir / filename)
+        return font
+    return assets.registry.sys_font(**value)
+
+
+def _load_image(value: Any) -> pygame.Surface:
+    # return a version of the image optimized
+    # for blit with pixel alphas preserved
+    return assets.registry.image(value, convert_alpha=True)
+
+
+def load_yaml(filepath: str | pathlib.PurePath) -> Any:
+    """Reads a YAML file, reusing the parsed data from a previous run if possible
+
+    Parsed files are stored in the game cache directory, keyed by the file
+    path, modification time and size, so unchanged files are only parsed once
+    rather than on every launch.
+
+    Args:
+        filepath (str | pathlib.PurePath): path of the YAML file to read
+
+    Returns:
+        Any: the parsed YAML document
+    """
+    stat = os.stat(filepath)
+    key = (
+        _YAML_CACHE_VERSION,
+        tuple(sys.version_info[:2]),
+        str(filepath),
+        stat.st_mtime_ns,
+        stat.st_size,
+    )
+    cache_file = None
+    if _conf.GAME.cache_dir is not None:
+        path_hash = hashlib.sha1(str(filepath).encode()).hexdigest()
+        cache_file = pathlib.Path(_conf.GAME.cache_dir / "yaml" / f"{path_hash}.bin")
+        try:
+            with open(cache_file, "rb") as f:
+                cached_key, data = marshal.load(f)
+            if cached_key == key:
+                return data
+        except OSError:
+            pass
+        except (EOFError, ValueError, TypeError) as e:
+            logger.warning("Ignoring corrupt YAML cache %s: %s", cache_file, e)
+
+    with open(filepath, "rb") as f:
+        data = yaml.load(f, Loader=SafeLoader)
+
+    if cache_file is not None:
+        _write_yaml_cache(cache_file, key, data)
+    return data
+
+
+def _write_yaml_cache(cache_file: pathlib.Path, key: tuple, data: Any):
+    try:
+        # marshal is faster than pickle, but only handles builtin types, so
+        # YAML timestamps can't be cached. it isn't safe against malformed
+        # data, which is fine for files the game writes to its own cache dir
+        dumped = marshal.dumps((key, data))
+    except ValueError:
+        logger.debug("Not caching YAML with unsupported types: %s", key[2])
+        return
+    try:
+        write_atomic(cache_file, dumped)
+    except OSError as e:
+        logger.error("Failed to write YAML cache %s: %s", cache_file, e)
+
+
+def write_atomic(filepath: str | os.PathLike, data: bytes):
+    """Writes a file so that it's either fully written or left unchanged
+
+    Data is written to a temporary file in the same directory, which then
+    replaces the file. Parent directories are created if needed.
+    """
+    filepath = pathlib.Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = filepath.with_name(
+        f"{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_file)
+        raise
+
+
+class SettingsWriter:
+    """Saves user settings files on a background thread
+
+    Saves of the same file are coalesced: a file is written once no save
+    has been requested for it for the given delay, so settings changed every
+    frame (eg. with a volume slider) are only written once. Writes happen on
+    a daemon timer thread, one per file with pending changes, and replace
+    files atomically, so a crash can't leave a half-written settings file.
+
+    Args:
+        delay (float): seconds to wait for further changes before writing
+    """
+
+    def __init__(self, delay: float = const.DEFAULT_SETTINGS_SAVE_DELAY):
+        self.delay = delay
+        self.writes = 0
+        # latest data to write for each file, taken by whichever writes first
+        self._pending: Dict[pathlib.PurePath, dict] = {}
+        # when each file with a running timer is due to be written. saves
+        # push the deadline back rather than starting another timer
+        self._deadlines: Dict[pathlib.PurePath, float] = {}
+        self._lock = threading.Lock()
+        self._deadline_changed = threading.Condition(self._lock)
+        # serializes writes, as a flush can overlap a timer's write
+        self._write_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of files waiting to be written"""
+        return len(self._pending)
+
+    def save(self, filepath: pathlib.PurePath, data: dict):
+        """Schedules writing data to a YAML file
+
+        Data is copied, so it can be changed after this returns. An empty
+        dict removes the file instead.
+        """
+        with self._lock:
+            self._pending[filepath] = copy.deepcopy(data)
+            if self.delay > 0:
+                timer_running = filepath in self._deadlines
+                self._deadlines[filepath] = time.monotonic() + self.delay
+                if timer_running:
+                    return
+                threading.Thread(
+                    target=self._write_when_due,
+                    args=(filepath,),
+                    name="settings-writer",
+                    daemon=True,
+                ).start()
+                return
+        self._write(filepath)
+
+    def flush(self):
+        """Writes all pending files now, eg. before the game exits"""
+        with self._lock:
+            # stop the timers, as there's nothing left for them to write
+            self._deadlines.clear()
+            self._deadline_changed.notify_all()
+        for filepath in list(self._pending):
+            self._write(filepath)
+
+    def _write_when_due(self, filepath: pathlib.PurePath):
+        with self._lock:
+            while True:
+                deadline = self._deadlines.get(filepath)
+                if deadline is None:
+                    # flushed
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._deadline_changed.wait(remaining)
+            del self._deadlines[filepath]
+        self._write(filepath)
+
+    def _write(self, filepath: pathlib.PurePath):
+        with self._write_lock:
+            with self._lock:
+                data = self._pending.pop(filepath, None)
+            if data is None:
+                # already written by flush() or an earlier timer
+                return
+            try:
+                if data:
+                    dumped = yaml.dump(data, Dumper=SafeDumper, sort_keys=False)
+                    write_atomic(filepath, dumped.encode())
+                else:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(filepath)
+                self.writes += 1
+                logger.debug("Saved user settings to %s", filepath)
+            except yaml.YAMLError as e:
+                logger.error("Failed to write YAML to %s: %s", filepath, e)
+            except OSError as e:
+                logger.error("Error writing %s: %s", filepath, e)
 
 
 # pyright (and thus pylance) has a strict approach to abstract property types,
@@ -114,10 +487,193 @@ class SupportsLoad(Protocol[ConfigurableT_co]):
 LoadableT = TypeVar("LoadableT", bound=SupportsLoad[Configurable])
 
 
+# loaded instances are keyed by class and settings file path. the path is
+# None for classes without a settings file that are loaded with settings
+_LoadableKey = Tuple[type, pathlib.PurePath | None]
+
+
+@dataclasses.dataclass
+class _SettingsFile:
+    # shipped settings from the resource directory
+    defaults: dict
+    # defaults with user settings applied
+    values: dict
+    # where changes to the defaults are saved, if anywhere
+    user_path: pathlib.PurePath | None
+    # user settings as last read or written
+    saved: dict
+
+    def changes(self) -> dict:
+        """Returns the values that differ from the defaults"""
+        return {
+            k: v
+            for k, v in self.values.items()
+            if k not in self.defaults or self.defaults[k] != v
+        }
+
+
+@dataclasses.dataclass
+class _LoadedEntry:
+    instance: Any
+    # asset registry scope holding the assets loaded for the instance
+    scope: Hashable
+    # number of current users, eg. the scene stack. used entries aren't evicted
+    users: int = 0
+
+
+class LoadableRegistry:
+    """Cache of loaded Loadable instances and the settings files they use
+
+    Instances are keyed by their class and settings file, so a class can be
+    loaded from several files. Instances that are in use (eg. scenes on the
+    scene stack, see acquire()) stay loaded. Others are kept until the assets
+    they hold exceed the byte budget, then evicted least recently used first.
+    Evicted instances have their unload() hook called and their assets
+    released.
+
+    Args:
+        max_bytes (int): budget for the combined size of the assets held by
+            loaded instances, in bytes
+    """
+
+    def __init__(self, max_bytes: int = const.DEFAULT_LOADABLE_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        # parsed settings files, keyed by resource path
+        self.settings: Dict[pathlib.PurePath, _SettingsFile] = {}
+        self._instances: collections.OrderedDict[_LoadableKey, _LoadedEntry] = (
+            collections.OrderedDict()
+        )
+        # instance ids to keys, to find the entries of instances passed in
+        self._keys: Dict[int, _LoadableKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def configure(self, max_bytes: int | None = None):
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._evict()
+
+    @property
+    def nbytes(self) -> int:
+        """Combined size of the assets held by loaded instances
+
+        Assets shared by several instances are counted for each of them.
+        """
+        return sum(
+            assets.registry.scope_size(entry.scope)
+            for entry in self._instances.values()
+        )
+
+    def get(self, cls: type, filepath: pathlib.PurePath | None) -> Any:
+        """Returns the loaded instance of the class, or None if not loaded"""
+        key = (cls, filepath)
+        entry = self._instances.get(key)
+        if entry is None:
+            return None
+        self._instances.move_to_end(key)
+        return entry.instance
+
+    def add(self, cls: type, filepath: pathlib.PurePath | None, instance: Any):
+        key = (cls, filepath)
+        replaced = self._instances.pop(key, None)
+        if replaced is not None:
+            del self._keys[id(replaced.instance)]
+        self._instances[key] = _LoadedEntry(instance, instance.asset_scope)
+        self._keys[id(instance)] = key
+        self._evict()
+
+    def acquire(self, instance: Any):
+        """Marks a loaded instance as in use, so it isn't evicted"""
+        key = self._keys.get(id(instance))
+        if key is not None:
+            self._instances[key].users += 1
+            self._instances.move_to_end(key)
+
+    def release(self, instance: Any):
+        """Marks an instance as no longer used by the caller
+
+        Instances that aren't cached release their assets right away, and
+        cached instances can be evicted once nothing uses them.
+        """
+        key = self._keys.get(id(instance))
+        if key is None:
+            scope = getattr(instance, "asset_scope", None)
+            if scope is not None:
+                assets.registry.release(scope)
+            return
+        entry = self._instances[key]
+        entry.users = max(entry.users - 1, 0)
+        self._evict()
+
+    def evict(self, key: _LoadableKey):
+        entry = self._instances.pop(key)
+        del self._keys[id(entry.instance)]
+        self.evictions += 1
+        logger.debug("Evicting %s loaded from %s", key[0].__name__, key[1])
+        entry.instance.unload()
+        assets.registry.release(entry.scope)
+
+    def _evict(self):
+        if self.nbytes <= self.max_bytes:
+            return
+        for key, entry in list(self._instances.items()):
+            if entry.users == 0:
+                self.evict(key)
+                if self.nbytes <= self.max_bytes:
+                    break
+
+    def reload(self, filepath: pathlib.PurePath) -> List[Any]:
+        """Reads a changed settings file again and applies it to instances
+
+        User changes to the settings are kept. Instances loaded from the file
+        are passed the new settings with Loadable.reload().
+
+        Returns:
+            List[Any]: the instances that were reloaded
+        """
+        settings = self.settings.get(filepath)
+        if settings is None:
+            # not loaded yet, so the changes will be read when it is
+            return []
+        defaults: dict = load_yaml(filepath)
+        values = copy.deepcopy(defaults)
+        values.update(settings.changes())
+        settings.defaults, settings.values = defaults, values
+
+        reloaded = []
+        for (cls, path), entry in list(self._instances.items()):
+            if path == filepath:
+                with assets.registry.scope(entry.scope):
+                    decoded = cls.settings_type.from_config(
+                        values, lazy=cls.lazy_settings
+                    )
+                    entry.instance.reload(decoded)
+                reloaded.append(entry.instance)
+        return reloaded
+
+    def clear(self):
+        """Evicts every instance, including those in use, and parsed settings"""
+        for key in list(self._instances):
+            self.evict(key)
+        self.settings.clear()
+
+
 class Loadable:
     """Mixin to mark scenes as loadable from YAML"""
 
-    __loaded = {}
+    # defer loading images and fonts in settings until they're first used,
+    # eg. for menus with many options that are rarely all shown. the settings
+    # type can't be a dataclass with slots=True
+    lazy_settings: bool = False
+
+    # settings file path and asset registry scope holding assets loaded for
+    # the instance. set when created with instance() or load()
+    settings_path: pathlib.PurePath | None = None
+    asset_scope: Hashable | None = None
+    # positional and keyword arguments the instance was created with
+    _load_args: Tuple[tuple, dict] | None = None
 
     # needed for mixin as otherwise we may have super() conflicts with
     # subclasses that also inherit from another parent
@@ -126,54 +682,110 @@ class Loadable:
 
     @classmethod
     def instance(cls: Type[LoadableT], *args, **kwargs) -> LoadableT:
+        """Creates an instance that isn't cached, from the settings file
+
+        Takes the same arguments as load(). The instance's assets are held in
+        a scope of its own, so releasing it leaves the assets of the cached
+        instance loaded from the same file alone.
+        """
+        filepath = cls._settings_path(kwargs.get("settings_file"))
+        return cls._create((cls, filepath, object()), *args, **kwargs)
+
+    @classmethod
+    def _create(cls: Type[LoadableT], scope: Hashable, *args, **kwargs) -> LoadableT:
         settings_file = kwargs.pop("settings_file", None)
-        settings = kwargs.get("settings") or cls._load_settings(file=settings_file)
-        return cls(*args, **kwargs, settings=settings)
+        filepath = cls._settings_path(settings_file)
+        # hold assets loaded by the instance until it's released, eg. when
+        # a scene ends
+        with assets.registry.scope(scope):
+            settings = kwargs.get("settings") or cls._load_settings(file=settings_file)
+            o = cls(*args, **kwargs, settings=settings)
+        o.settings_path = filepath
+        o.asset_scope = scope
+        kwargs.pop("settings", None)
+        o._load_args = (args, kwargs)
+        return o
 
     @classmethod
     def load(cls: Type[LoadableT], *args, **kwargs) -> LoadableT:
         """Loads referencing class from settings file
 
         Passes given arguments to the class constructor.
-        Caches classes and files so they are only loaded once.
+        Caches instances by class and settings file so they are only loaded
+        once, until evicted from the registry (see LoadableRegistry).
 
         If a settings keyword argument is provided, creates an instance with
         the given values, otherwise loads values from defined settings_file.
         """
-        if cls.__name__ in Loadable.__loaded:
-            return Loadable.__loaded[cls.__name__]
-
-        o = cls.instance(*args, **kwargs)
-        Loadable.__loaded[cls.__name__] = o
+        filepath = cls._settings_path(kwargs.get("settings_file"))
+        o = registry.get(cls, filepath)
+        if o is None:
+            # the scope Preloader.loadable() holds preloaded images in
+            o = cls._create((cls, filepath), *args, **kwargs)
+            registry.add(cls, filepath, o)
         return o
 
+    def reload(self, settings: Configurable):
+        """Applies changed settings, eg. when its settings file is edited with
+        hot reloading enabled
+
+        By default, runs __init__ again with the arguments the instance was
+        created with, which resets its state. Override to keep state.
+        """
+        if self._load_args is None:
+            raise pygame.error(f"{type(self).__name__} wasn't loaded from settings")
+        args, kwargs = self._load_args
+        self.__init__(*args, **kwargs, settings=settings)
+
+    def unload(self):
+        """Called when the instance is evicted from the loaded instance cache
+
+        Override to release surfaces and other resources that aren't managed
+        by the asset registry. Assets the instance loaded are released after.
+        """
+        pass
+
+    @classmethod
+    def _settings_path(cls, file: str | None = None) -> pathlib.PurePath | None:
+        settings_file = file or getattr(cls, "settings_file", None)
+        if settings_file is None:
+            return None
+        return utils.normalize_path_str(_conf.GAME.resource_dir / settings_file)
+
     @classmethod
     def _load_settings(cls: Type[LoadableT], file: str | None = None) -> Configurable:
         settings_file = file if file else cls.settings_file
-        filepath = utils.normalize_path_str(_conf.GAME.resource_dir / settings_file)
+        filepath = cls._settings_path(settings_file)
         filename = pathlib.PurePath(filepath).name
         # cache the settings file - useful for future objects that
         # may load multiple instances from the same settings
-        if filepath in Loadable.__loaded:
-            return Loadable.__loaded[filepath]
+        if filepath in registry.settings:
+            return cls.settings_type.from_config(
+                registry.settings[filepath].values, lazy=cls.lazy_settings
+            )
 
+        user_path = None
         user_settings = {}
         try:
             if _conf.GAME.config_dir is not None:
-                path = utils.normalize_path_str(_conf.GAME.config_dir / settings_file)
-                with open(path) as f:
-                    user_settings: dict = yaml.safe_load(f)
+                user_path = utils.normalize_path_str(
+                    _conf.GAME.config_dir / settings_file
+                )
+                user_settings: dict = load_yaml(user_path) or {}
         except OSError:
             logger.debug("No saved user settings file found: %s", filename)
         except Exception as e:
             logger.error("Error reading user settings at %s: %s", filename, e)
 
         try:
-            with open(filepath) as f:
-                settings: dict = yaml.safe_load(f)
-                settings.update(user_settings)
-                Loadable.__loaded[filepath] = settings
-                return cls.settings_type.from_config(settings)
+            defaults: dict = load_yaml(filepath)
+            # copy so that changes to nested values don't change the defaults
+            settings = copy.deepcopy(defaults)
+            settings.update(user_settings)
+            registry.settings[filepath] = _SettingsFile(
+                defaults, settings, user_path, user_settings
+            )
+            return cls.settings_type.from_config(settings, lazy=cls.lazy_settings)
         except yaml.YAMLError as e:
             logger.error("Failed to read YAML from %s: %s", filepath, e)
         except (OSError, IOError) as e:
@@ -181,29 +793,58 @@ class Loadable:
 
         raise pygame.error(f"Failed to read configuration from {filepath}")
 
+    @classmethod
+    def update_settings(
+        cls, values: dict, settings_file: str | None = None, save: bool = True
+    ):
+        """Changes loaded settings values and saves them to the user settings
+
+        Changes apply to instances created afterwards.
+
+        Args:
+            values (dict): settings values to change, keyed by field name
+            settings_file (str | None): settings file to change, if not the
+                class settings file
+            save (bool): schedule saving the user settings file
+        """
+        filepath = cls._settings_path(settings_file)
+        if filepath not in registry.settings:
+            cls._load_settings(file=settings_file)
+        registry.settings[filepath].values.update(values)
+        if save:
+            Loadable._save(filepath)
+
     @staticmethod
     def save_all():
+        """Saves user settings files that changed since they were last saved"""
         if _conf.GAME.config_dir is not None:
-            for filepath in Loadable.__loaded.keys():
+            for filepath in list(registry.settings):
                 Loadable._save(filepath)
 
-    def save(self: SupportsLoad[Configurable]):
-        Loadable._save(self.settings_file)
+    def save(self):
+        if self.settings_path is not None:
+            Loadable._save(self.settings_path)
 
     @staticmethod
-    def _save(filepath):
-        if _conf.GAME.config_dir is None:
-            return
-
-        filepath = utils.normalize_path_str(_conf.GAME.config_dir / filepath)
-
+    def _save(filepath: pathlib.PurePath):
         try:
-            settings = Loadable.__loaded[filepath]
-            with open(filepath, "w") as f:
-                yaml.safe_dump(settings, f)
+            settings = registry.settings[filepath]
         except KeyError:
             logger.error("%s not found in loaded file cache", filepath)
-        except yaml.YAMLError as e:
-            logger.error("Failed to read YAML from %s: %s", filepath, e)
-        except (OSError, IOError) as e:
-            logger.error("Error reading %s: %s", filepath, e)
+            return
+        if settings.user_path is None:
+            return
+
+        # only save values that differ from the shipped settings, so that
+        # updated defaults in new versions of the game still apply
+        changed = settings.changes()
+        if changed != settings.saved:
+            settings.saved = copy.deepcopy(changed)
+            writer.save(settings.user_path, changed)
+
+
+registry = LoadableRegistry()
+writer = SettingsWriter()
+
+metrics.registry.gauge("loadables.entries", lambda: len(registry))
+metrics.registry.gauge("loadables.size", lambda: registry.nbytes / 1024, "{:.0f}KB")
@@ -4,7 +4,7 @@ from typing import Dict, List, Type
 
 import pygame
 
-from . import io
+from . import io, metrics
 from .logs import logger
 
 
@@ -68,6 +68,9 @@ class __KeyController:
 
 key = __KeyController()
 
+metrics.registry.gauge("keys.bindings", lambda: len(key.key_bindings))
+metrics.registry.gauge("keys.toggled", lambda: sum(key.keys_toggled.values()))
+
 
 __all__ = [
     "KeyBinding",
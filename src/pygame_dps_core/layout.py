@@ -0,0 +1,443 @@
+import collections
+import dataclasses
+import enum
+import functools
+import glob
+import hashlib
+import json
+import os
+import pathlib
+import string
+import weakref
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pygame
+import yaml
+
+from . import _conf, const, io, utils
+from .logs import logger
+
+# lines of text split into windows that fit in a text box
+Pages = Tuple[Tuple[str, ...], ...]
+
+# bump to invalidate baked layouts when the wrapping logic changes
+_BAKE_FORMAT_VERSION = 1
+
+
+class WrapMode(enum.Enum):
+    # fit as many words as possible on each line
+    GREEDY = "greedy"
+    # minimize raggedness across all lines of a paragraph. more expensive
+    # than greedy wrapping, but avoids very short lines in the middle of
+    # a paragraph
+    BALANCED = "balanced"
+
+
+@dataclasses.dataclass(frozen=True)
+class TextLayout:
+    """Result of wrapping text to a fixed width
+
+    Layouts are immutable and memoized by wrap(), so the same layout can be
+    reused across frames and scenes.
+    """
+
+    lines: Tuple[str, ...]
+    widths: Tuple[int, ...]
+    line_height: int
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, idx):
+        return self.lines[idx]
+
+    @property
+    def height(self) -> int:
+        return len(self.lines) * self.line_height
+
+
+@dataclasses.dataclass
+class _Token:
+    text: str
+    width: int
+    # force a line break after this token, used for split words
+    hard_break: bool = False
+
+
+class _WordWidths:
+    """Bounded LRU cache of rendered word widths for a single font"""
+
+    def __init__(self, font: pygame.font.Font, maxsize: int):
+        # a proxy, so the cache doesn't keep its font alive
+        self.font = weakref.proxy(font)
+        self.maxsize = maxsize
+        self.space = font.size(" ")[0]
+        self._widths: collections.OrderedDict[str, int] = collections.OrderedDict()
+
+    def __call__(self, word: str) -> int:
+        width = self._widths.get(word)
+        if width is not None:
+            self._widths.move_to_end(word)
+            return width
+
+        width = self.font.size(word)[0]
+        self._widths[word] = width
+        if len(self._widths) > self.maxsize:
+            self._widths.popitem(last=False)
+        return width
+
+
+_word_widths: weakref.WeakKeyDictionary[pygame.font.Font, _WordWidths] = (
+    weakref.WeakKeyDictionary()
+)
+
+# memoized layouts, keyed by font fingerprint rather than by font so they
+# don't keep fonts alive, and are shared by fonts that render the same
+_LayoutKey = Tuple[str, str, int, WrapMode]
+_layouts: collections.OrderedDict[_LayoutKey, TextLayout] = collections.OrderedDict()
+
+# fingerprints of each font, by style
+_fingerprints: weakref.WeakKeyDictionary[
+    pygame.font.Font, Dict[Tuple[bool, ...], str]
+] = weakref.WeakKeyDictionary()
+
+
+def _get_word_widths(font: pygame.font.Font) -> _WordWidths:
+    widths = _word_widths.get(font)
+    if widths is None:
+        widths = _word_widths[font] = _WordWidths(font, const.WORD_WIDTH_CACHE_SIZE)
+    return widths
+
+
+def wrap(
+    text: str,
+    font: pygame.font.Font,
+    width: int,
+    mode: WrapMode = WrapMode.GREEDY,
+) -> TextLayout:
+    """Wraps text to fit in the given width
+
+    Existing line breaks are preserved. Words wider than the line are split
+    across lines, hyphenated where the hyphen fits.
+
+    Args:
+        text (str): text to wrap
+        font (pygame.font.Font): font the text will be rendered with
+        width (int): maximum line width in pixels
+        mode (WrapMode): line breaking strategy
+
+    Returns:
+        TextLayout: the wrapped lines and their widths
+    """
+    key = (text, font_fingerprint(font), width, mode)
+    layout = _layouts.get(key)
+    if layout is not None:
+        _layouts.move_to_end(key)
+        return layout
+
+    layout = _layouts[key] = _wrap(text, font, width, mode)
+    if len(_layouts) > const.TEXT_LAYOUT_CACHE_SIZE:
+        _layouts.popitem(last=False)
+    return layout
+
+
+def _wrap(text: str, font: pygame.font.Font, width: int, mode: WrapMode) -> TextLayout:
+    widths = _get_word_widths(font)
+    break_lines = _break_greedy if mode is WrapMode.GREEDY else _break_balanced
+    lines: List[Tuple[str, int]] = []
+
+    for paragraph in text.splitlines():
+        tokens = _tokenize(paragraph, widths, width)
+        if not tokens:
+            # keep blank lines from the source text
+            lines.append(("", 0))
+            continue
+        # split words always end a line, so break each run separately
+        start = 0
+        for i, token in enumerate(tokens):
+            if token.hard_break or i == len(tokens) - 1:
+                lines.extend(break_lines(tokens[start : i + 1], widths.space, width))
+                start = i + 1
+
+    return TextLayout(
+        lines=tuple(line for line, _ in lines),
+        widths=tuple(w for _, w in lines),
+        line_height=font.get_linesize(),
+    )
+
+
+def _tokenize(paragraph: str, widths: _WordWidths, width: int) -> List[_Token]:
+    tokens = []
+    for word in paragraph.split():
+        word_width = widths(word)
+        if word_width <= width:
+            tokens.append(_Token(word, word_width))
+        else:
+            tokens.extend(_split_word(word, widths, width))
+    return tokens
+
+
+def _split_word(word: str, widths: _WordWidths, width: int) -> List[_Token]:
+    """Splits a word that's too wide for the line into pieces that fit"""
+    pieces = []
+    while word:
+        end = _fit_prefix(word, widths.font, width)
+        piece = word[:end]
+        # hyphenate if there's room, shortening the piece until it fits
+        # with its hyphen. pieces that were already a single character
+        # aren't hyphenated, as that can loop forever on very narrow lines
+        if end < len(word) and end > 1:
+            for hyphen_end in range(end, 0, -1):
+                hyphenated = f"{word[:hyphen_end]}-"
+                if widths.font.size(hyphenated)[0] <= width:
+                    end, piece = hyphen_end, hyphenated
+                    break
+
+        word = word[end:]
+        # the last piece of the word can share a line with the next word
+        pieces.append(_Token(piece, widths(piece), hard_break=bool(word)))
+    return pieces
+
+
+def _fit_prefix(word: str, font: pygame.font.Font, width: int) -> int:
+    """Returns the length of the longest prefix of word that fits in width"""
+    lo, hi = 1, len(word)
+    # always fit at least one character, even if it overflows the line
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if font.size(word[:mid])[0] <= width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _join(tokens: List[_Token], space: int) -> Tuple[str, int]:
+    line = " ".join(t.text for t in tokens)
+    return line, sum(t.width for t in tokens) + space * (len(tokens) - 1)
+
+
+def _break_greedy(
+    tokens: List[_Token], space: int, width: int
+) -> List[Tuple[str, int]]:
+    lines = []
+    start = 0
+    line_width = tokens[0].width
+
+    for i in range(1, len(tokens)):
+        next_width = line_width + space + tokens[i].width
+        if next_width > width:
+            lines.append(_join(tokens[start:i], space))
+            start = i
+            line_width = tokens[i].width
+        else:
+            line_width = next_width
+
+    lines.append(_join(tokens[start:], space))
+    return lines
+
+
+def _break_balanced(
+    tokens: List[_Token], space: int, width: int
+) -> List[Tuple[str, int]]:
+    # minimum raggedness: choose breaks minimizing the sum of squared slack
+    # on every line but the last (in the style of Knuth-Plass, without
+    # stretchable glue). costs[i] is the best cost of laying out tokens[i:]
+    n = len(tokens)
+    costs = [0] * (n + 1)
+    breaks = [n] * (n + 1)
+
+    for i in range(n - 1, -1, -1):
+        best_cost = None
+        line_width = -space
+        for j in range(i, n):
+            line_width += space + tokens[j].width
+            if line_width > width and j > i:
+                break
+            slack = width - line_width
+            cost = 0 if j == n - 1 else slack * slack + costs[j + 1]
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                breaks[i] = j + 1
+        costs[i] = best_cost or 0
+
+    lines = []
+    i = 0
+    while i < n:
+        lines.append(_join(tokens[i : breaks[i]], space))
+        i = breaks[i]
+    return lines
+
+
+def paginate(
+    text: str,
+    font: pygame.font.Font,
+    size: Tuple[int, int],
+    justify: bool = False,
+    mode: WrapMode = WrapMode.GREEDY,
+) -> Pages:
+    """Splits text into pages of lines that fit in a box of the given size"""
+    width, height = size
+    if justify:
+        lines = wrap(text, font, width, mode).lines
+    else:
+        lines = tuple(text.splitlines())
+    lines_per_page = max(height // font.get_linesize(), 1)
+    return tuple(
+        lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)
+    )
+
+
+def bake(
+    dialogue_file: str | pathlib.PurePath,
+    font: pygame.font.Font,
+    size: Tuple[int, int],
+    justify: bool = False,
+    mode: WrapMode = WrapMode.GREEDY,
+) -> Dict[str, Pages]:
+    """Returns pages for every line of text in a YAML dialogue file
+
+    Pages are computed once and stored in the game cache directory, keyed by
+    the dialogue file path and contents, the font and the layout settings.
+    Each dialogue file keeps one cache file for each set of font and layout
+    settings it's baked with. Changing the dialogue file computes a new set
+    of pages and replaces the stale cache file for the same settings.
+
+    Args:
+        dialogue_file (str | pathlib.PurePath): path to a YAML file relative to
+            the game resource directory. all strings in the file, at any
+            depth, are treated as dialogue text
+        font (pygame.font.Font): font the text will be rendered with
+        size (Tuple[int, int]): size of the text area in pixels
+        justify (bool): whether to wrap text to the text area width
+        mode (WrapMode): line breaking strategy when justifying
+
+    Returns:
+        Dict[str, Pages]: pages for each dialogue string
+    """
+    filepath = utils.normalize_path_str(_conf.GAME.resource_dir / dialogue_file)
+    with open(filepath, "rb") as f:
+        data = f.read()
+
+    settings = hashlib.sha1(font_fingerprint(font).encode())
+    settings.update(repr((_BAKE_FORMAT_VERSION, tuple(size), justify, mode)).encode())
+    contents = hashlib.sha1(data).hexdigest()
+    cache_file = None
+    if _conf.GAME.cache_dir is not None:
+        # one directory per dialogue file, so files with the same name in
+        # different directories don't share cache files
+        source = utils.normalize_path_str(dialogue_file)
+        source_key = hashlib.sha1(source.as_posix().encode()).hexdigest()[:16]
+        cache_dir = _conf.GAME.cache_dir / "text" / f"{source.stem}.{source_key}"
+        cache_file = cache_dir / f"{settings.hexdigest()}.{contents}.json"
+        pages = _read_baked(cache_file)
+        if pages is not None:
+            return pages
+
+    pages = {
+        text: paginate(text, font, size, justify, mode)
+        for text in _collect_strings(yaml.load(data, Loader=io.SafeLoader))
+    }
+    if cache_file is not None:
+        _write_baked(cache_file, pages)
+    return pages
+
+
+def _collect_strings(data: Any) -> Iterator[str]:
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from _collect_strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _collect_strings(value)
+
+
+def _read_baked(cache_file: pathlib.PurePath) -> Dict[str, Pages] | None:
+    try:
+        with open(cache_file) as f:
+            baked = json.load(f)
+        return {
+            text: tuple(tuple(page) for page in pages) for text, pages in baked.items()
+        }
+    except OSError:
+        return None
+    except ValueError as e:
+        logger.warning("Ignoring corrupt text layout cache %s: %s", cache_file, e)
+        return None
+
+
+def _write_baked(cache_file: pathlib.Path, pages: Dict[str, Pages]):
+    # cache files are named <settings>.<contents>.json
+    settings = cache_file.name.split(".")[0]
+    try:
+        io.write_atomic(cache_file, json.dumps(pages, separators=(",", ":")).encode())
+        # remove layouts baked with the same settings for an older version
+        # of the dialogue file
+        for stale in cache_file.parent.glob(f"{glob.escape(settings)}.*.json"):
+            if stale != cache_file:
+                stale.unlink()
+    except OSError as e:
+        logger.error("Failed to write text layout cache %s: %s", cache_file, e)
+
+
+def font_fingerprint(font: pygame.font.Font) -> str:
+    """Returns a string identifying the font file, size and style"""
+    style = (font.bold, font.italic, font.underline, font.strikethrough)
+    fingerprints = _fingerprints.setdefault(font, {})
+    fingerprint = fingerprints.get(style)
+    if fingerprint is None:
+        fingerprint = fingerprints[style] = _fingerprint(font)
+    return fingerprint
+
+
+def _fingerprint(font: pygame.font.Font) -> str:
+    parts = [
+        font.get_height(),
+        font.get_linesize(),
+        font.get_ascent(),
+        font.bold,
+        font.italic,
+        font.underline,
+        font.strikethrough,
+        font.size(string.printable.strip()),
+    ]
+    font_file = io.font_files.get(font)
+    if font_file is not None:
+        try:
+            stat = os.stat(font_file)
+            parts.append(_file_digest(font_file, stat.st_mtime_ns, stat.st_size))
+        except OSError as e:
+            # eg. the font file was moved after it was loaded. the metrics
+            # above still identify the font well enough
+            logger.warning("Failed to read font file %s: %s", font_file, e)
+    return repr(parts)
+
+
+@functools.lru_cache()
+def _file_digest(path: pathlib.PurePath, mtime_ns: int, size: int) -> str:
+    # mtime and size are only used to invalidate the cached digest
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def clear_caches():
+    """Empties the memoized layouts, word widths and font fingerprints"""
+    _layouts.clear()
+    _word_widths.clear()
+    _fingerprints.clear()
+
+
+__all__ = [
+    "WrapMode",
+    "TextLayout",
+    "wrap",
+    "paginate",
+    "bake",
+    "font_fingerprint",
+    "clear_caches",
+]
@@ -0,0 +1,303 @@
+import abc
+import array
+import contextlib
+import csv
+import json
+import pathlib
+import time
+from typing import Any, Callable, Dict, Iterator, TypeVar
+
+import pygame
+
+from . import const
+from .logs import logger
+
+MetricT = TypeVar("MetricT", bound="Metric")
+
+
+class Metric(abc.ABC):
+    """Base class for named values tracked in a metrics registry
+
+    Args:
+        name (str): unique name of the metric, eg. "text_cache.hit_rate"
+        fmt (str): format string used to display the value
+    """
+
+    def __init__(self, name: str, fmt: str = "{}"):
+        self.name = name
+        self.fmt = fmt
+
+    @abc.abstractmethod
+    def value(self) -> Any:
+        pass
+
+    def format(self) -> str:
+        return self.fmt.format(self.value())
+
+
+class Counter(Metric):
+    """Monotonically increasing count, eg. of events handled"""
+
+    def __init__(self, name: str, fmt: str = "{}"):
+        super().__init__(name, fmt)
+        self.count = 0
+
+    def inc(self, n: int = 1):
+        self.count += n
+
+    def reset(self):
+        self.count = 0
+
+    def value(self) -> int:
+        return self.count
+
+
+class Gauge(Metric):
+    """Current value of something, either set directly or read from a source
+
+    Args:
+        name (str): unique name of the metric
+        source (Callable[[], Any] | None): called to read the value when the
+            metric is displayed or exported, so nothing needs to be pushed
+            each frame
+        fmt (str): format string used to display the value
+    """
+
+    def __init__(
+        self, name: str, source: Callable[[], Any] | None = None, fmt: str = "{}"
+    ):
+        super().__init__(name, fmt)
+        self.source = source
+        self._value: Any = None
+
+    def set(self, value: Any):
+        self._value = value
+
+    def value(self) -> Any:
+        if self.source is not None:
+            return self.source()
+        return self._value
+
+
+class Histogram(Metric):
+    """Distribution of the most recent observations
+
+    Observations are stored in a fixed-size ring buffer, so recording a value
+    doesn't allocate and old values roll out of the window.
+
+    Args:
+        name (str): unique name of the metric
+        window (int): number of observations to keep
+        fmt (str): format string used to display each statistic
+    """
+
+    def __init__(
+        self, name: str, window: int = const.DEFAULT_METRICS_WINDOW, fmt: str = "{:.2f}"
+    ):
+        super().__init__(name, fmt)
+        self.window = max(window, 1)
+        self.count = 0
+        self._values = array.array("d", bytes(8 * self.window))
+
+    def observe(self, value: float):
+        self._values[self.count % self.window] = value
+        self.count += 1
+
+    def values(self) -> array.array:
+        """Returns the observations in the window, in no particular order"""
+        return self._values[: min(self.count, self.window)]
+
+    def percentile(self, p: float) -> float:
+        values = sorted(self.values())
+        if not values:
+            return 0
+        return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+    def mean(self) -> float:
+        values = self.values()
+        return sum(values) / len(values) if values else 0
+
+    def value(self) -> Dict[str, float]:
+        values = sorted(self.values())
+        if not values:
+            return {"mean": 0, "p50": 0, "p95": 0, "max": 0}
+        return {
+            "mean": sum(values) / len(values),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) * 95 // 100, len(values) - 1)],
+            "max": values[-1],
+        }
+
+    def format(self) -> str:
+        return " ".join(f"{k} {self.fmt.format(v)}" for k, v in self.value().items())
+
+
+class Timer(Histogram):
+    """Histogram of durations in milliseconds"""
+
+    def record(self, seconds: float):
+        self.observe(seconds * 1000)
+
+    @contextlib.contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def format(self) -> str:
+        return super().format() + " ms"
+
+
+class Registry:
+    """Collection of metrics registered by name
+
+    Registering a metric under an existing name of the same type returns the
+    existing metric, so subsystems can register on every load without
+    duplicating or resetting values.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def __iter__(self) -> Iterator[Metric]:
+        return iter(list(self._metrics.values()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def register(self, metric: MetricT) -> MetricT:
+        """Adds a metric, replacing any existing metric with the same name"""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        self._metrics.pop(name, None)
+
+    def clear(self):
+        self._metrics.clear()
+
+    def _get_or_register(self, type_: type[MetricT], name: str, *args) -> MetricT:
+        metric = self._metrics.get(name)
+        if type(metric) is type_:
+            return metric  # type: ignore
+        return self.register(type_(name, *args))
+
+    def counter(self, name: str, fmt: str = "{}") -> Counter:
+        return self._get_or_register(Counter, name, fmt)
+
+    def gauge(
+        self, name: str, source: Callable[[], Any] | None = None, fmt: str = "{}"
+    ) -> Gauge:
+        gauge = self._get_or_register(Gauge, name, source, fmt)
+        # point an existing gauge at the new source, eg. a new Game instance
+        gauge.source = source
+        gauge.fmt = fmt
+        return gauge
+
+    def histogram(
+        self, name: str, window: int = const.DEFAULT_METRICS_WINDOW, fmt="{:.2f}"
+    ) -> Histogram:
+        return self._get_or_register(Histogram, name, window, fmt)
+
+    def timer(
+        self, name: str, window: int = const.DEFAULT_METRICS_WINDOW, fmt="{:.2f}"
+    ) -> Timer:
+        return self._get_or_register(Timer, name, window, fmt)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the current value of each metric
+
+        Histogram statistics are flattened into separate keys, eg.
+        "frame.time.p95", so snapshots can be written as table rows.
+        """
+        snapshot = {}
+        for metric in self:
+            value = metric.value()
+            if isinstance(value, dict):
+                for k, v in value.items():
+                    snapshot[f"{metric.name}.{k}"] = v
+            else:
+                snapshot[metric.name] = value
+        return snapshot
+
+    def formatted(self) -> Dict[str, str]:
+        """Returns the display string of each metric"""
+        return {metric.name: metric.format() for metric in self}
+
+
+registry = Registry()
+
+
+class MetricsExporter:
+    """Periodically appends registry snapshots to a CSV or JSON lines file
+
+    The file format is chosen by the file extension (.csv or .jsonl). CSV
+    columns are fixed by the first snapshot written, so metrics registered
+    later are only included in JSON lines exports.
+
+    Args:
+        path (str | pathlib.PurePath): file to append snapshots to
+        interval (float): seconds between snapshots
+        metrics (Registry): registry to export
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.PurePath,
+        interval: float = const.DEFAULT_METRICS_EXPORT_INTERVAL,
+        metrics: Registry = registry,
+    ):
+        self.path = pathlib.Path(path)
+        if self.path.suffix not in (".csv", ".jsonl"):
+            raise pygame.error(f"Unsupported metrics export format: {self.path}")
+        self.interval = interval
+        self.metrics = metrics
+        self._due_in = 0.0
+        self._csv: csv.DictWriter | None = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", newline="")
+        logger.info("Exporting metrics to %s", self.path)
+
+    def update(self, dt: float):
+        self._due_in -= dt
+        if self._due_in <= 0:
+            self._due_in = self.interval
+            self.write()
+
+    def write(self):
+        snapshot = {"time": time.time(), **self.metrics.snapshot()}
+        if self.path.suffix == ".jsonl":
+            self._file.write(json.dumps(snapshot, default=str) + "\n")
+        else:
+            if self._csv is None:
+                self._csv = csv.DictWriter(
+                    self._file, fieldnames=list(snapshot), extrasaction="ignore"
+                )
+                if self._file.tell() == 0:
+                    self._csv.writeheader()
+            self._csv.writerow(snapshot)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+__all__ = [
+    "Metric",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Timer",
+    "Registry",
+    "registry",
+    "MetricsExporter",
+]
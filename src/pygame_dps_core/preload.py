@@ -0,0 +1,260 @@
+import collections
+import concurrent.futures
+import dataclasses
+import io as _io
+import os
+import pathlib
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Type
+
+import pygame
+
+from . import assets, const, io, scenes
+from .logs import logger
+
+# file types pygame can decode that are worth loading ahead of time when
+# they're referenced from a settings file
+IMAGE_SUFFIXES = frozenset((".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tga", ".webp"))
+
+
+@dataclasses.dataclass
+class _Task:
+    name: Hashable
+    future: concurrent.futures.Future
+    # runs on the main thread with the result of the background work
+    finish: Callable[[Any], Any]
+
+
+class Preloader:
+    """Loads assets on background threads ahead of when they're needed
+
+    Reading files and decoding images happens on a thread pool. Work that has
+    to happen on the main thread, like converting images to the display
+    format, is done in update() a little at a time so the game loop keeps
+    running. A loading scene can call update() every frame and draw progress.
+
+    Loaded assets are added to the asset registry, so later loads of the
+    same files (eg. from settings) are registry hits.
+
+    Args:
+        workers (int | None): number of background threads. by default, one
+            less than the number of CPUs so the main thread isn't starved,
+            up to DEFAULT_PRELOAD_WORKERS
+        frame_budget (float): seconds of main thread work to do per update().
+            at least one task is finished per update regardless
+        scope (Hashable): asset registry scope to hold loaded assets in,
+            eg. the class of the scene being loaded
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        frame_budget: float = const.DEFAULT_PRELOAD_FRAME_BUDGET,
+        scope: Hashable = assets.GLOBAL_SCOPE,
+    ):
+        self.frame_budget = frame_budget
+        self.scope = scope
+        self.results: Dict[Hashable, Any] = {}
+        self.errors: Dict[Hashable, BaseException] = {}
+        self.total = 0
+        self.done = 0
+        if workers is None:
+            cpus = os.cpu_count() or 1
+            workers = max(min(cpus - 1, const.DEFAULT_PRELOAD_WORKERS), 1)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="preload"
+        )
+        self._tasks: collections.deque[_Task] = collections.deque()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of queued tasks that are finished, from 0 to 1"""
+        return self.done / self.total if self.total else 1
+
+    @property
+    def finished(self) -> bool:
+        return self.done >= self.total
+
+    def _submit(self, name: Hashable, work: Callable[[], Any], finish: Callable):
+        self.total += 1
+        self._tasks.append(_Task(name, self._pool.submit(work), finish))
+
+    def image(self, path: str | os.PathLike, convert_alpha: bool = True):
+        """Queues an image relative to the resource directory"""
+        filepath = assets.resource_path(path)
+        self._submit(
+            ("image", filepath),
+            lambda: _decode_image(filepath),
+            lambda img: assets.registry.add_image(path, img, convert_alpha),
+        )
+
+    def font(self, path: str | os.PathLike, size: int):
+        """Queues a font file relative to the resource directory"""
+        filepath = assets.resource_path(path)
+
+        def finish(data: bytes) -> pygame.font.Font:
+            font = pygame.font.Font(_io.BytesIO(data), size)
+            io.font_files[font] = filepath
+            return assets.registry.add_font(path, size, font)
+
+        self._submit(("font", filepath, size), lambda: _read(filepath), finish)
+
+    def loadable(self, cls: Type[io.Loadable], *args, settings_file=None, **kwargs):
+        """Queues loading a Loadable (eg. a scene) with Loadable.load()
+
+        The settings file is parsed in the background, and images it refers to
+        are decoded in the background too. The instance is then created on
+        the main thread, passing the given arguments to Loadable.load().
+        Results and errors are stored under (cls, settings file path), so
+        several settings files of one class can be preloaded together.
+        """
+        filepath = cls._settings_path(settings_file)
+        # the scope Loadable.load() loads the instance's assets in
+        scope = (cls, filepath)
+
+        def work() -> List[Tuple[str, pygame.Surface]]:
+            # parsing warms the parsed YAML cache read by Loadable
+            data = io.load_yaml(filepath)
+            return [
+                (path, _decode_image(assets.resource_path(path)))
+                for path in dict.fromkeys(_image_refs(data))
+            ]
+
+        def finish(images: List[Tuple[str, pygame.Surface]]) -> io.Loadable:
+            # hold the images with the instance's other assets, so they're
+            # released with the instance rather than with the preloader scope
+            with assets.registry.scope(scope):
+                for path, img in images:
+                    assets.registry.add_image(path, img)
+            if settings_file is not None:
+                kwargs["settings_file"] = settings_file
+            return cls.load(*args, **kwargs)
+
+        self._submit(scope, work, finish)
+
+    def update(self, budget: float | None = None):
+        """Finishes loaded tasks on the main thread
+
+        Args:
+            budget (float | None): seconds of work to do. defaults to the
+                preloader frame budget
+        """
+        if budget is None:
+            budget = self.frame_budget
+        start = time.perf_counter()
+        finished_any = False
+        with assets.registry.scope(self.scope):
+            for _ in range(len(self._tasks)):
+                task = self._tasks[0]
+                if not task.future.done():
+                    # keep tasks in order so results are ready for dependents
+                    break
+                if finished_any and time.perf_counter() - start > budget:
+                    break
+                self._tasks.popleft()
+                self._finish(task)
+                finished_any = True
+
+    def _finish(self, task: _Task):
+        try:
+            self.results[task.name] = task.finish(task.future.result())
+        except Exception as e:
+            logger.error("Failed to preload %s: %s", task.name, e)
+            self.errors[task.name] = e
+        self.done += 1
+
+    def wait(self):
+        """Blocks until everything queued is loaded"""
+        while not self.finished:
+            if self._tasks:
+                concurrent.futures.wait([self._tasks[0].future])
+            self.update(budget=float("inf"))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _read(filepath: pathlib.PurePath) -> bytes:
+    with open(filepath, "rb") as f:
+        return f.read()
+
+
+def _decode_image(filepath: pathlib.PurePath) -> pygame.Surface:
+    # load from the path rather than a file object so that SDL reads the file
+    # itself, without calling back into Python for every read
+    return pygame.image.load(str(filepath))
+
+
+def _image_refs(data: Any) -> List[str]:
+    """Returns strings in parsed settings that name image files"""
+    refs = []
+    if isinstance(data, str):
+        path = pathlib.PurePath(data)
+        if path.suffix.lower() in IMAGE_SUFFIXES:
+            if os.path.isfile(assets.resource_path(data)):
+                refs.append(data)
+    elif isinstance(data, dict):
+        for value in data.values():
+            refs.extend(_image_refs(value))
+    elif isinstance(data, list):
+        for value in data:
+            refs.extend(_image_refs(value))
+    return refs
+
+
+class LoadingScene(scenes.Scene):
+    """Scene shown while a preloader runs, switching to the next scene once done
+
+    Draws a progress bar by default; override draw() for a custom screen.
+
+    Args:
+        screen (pygame.Surface): draw surface for rendering the scene
+        preloader (Preloader): preloader with queued tasks
+        next_scene (Callable[[], scenes.Scene]): creates the scene to start
+            once loading is finished
+        bar_color (pygame.Color): progress bar color
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        preloader: Preloader,
+        next_scene: Callable[[], scenes.Scene],
+        bar_color: Any = "white",
+    ):
+        super().__init__(screen)
+        self.preloader = preloader
+        self.next_scene = next_scene
+        self.bar_color = bar_color
+        w, h = screen.get_size()
+        self.bar_rect = pygame.Rect(w // 4, h // 2 - 4, w // 2, 8)
+        self._drawn = -1
+
+    def handle_event(self, event: pygame.event.Event):
+        pass
+
+    def update(self, dt: float):
+        self.preloader.update()
+        if self.preloader.finished:
+            self.preloader.shutdown()
+            scenes.replace_scene(self.next_scene())
+
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
+        filled = int(self.bar_rect.w * self.preloader.progress)
+        if filled == self._drawn:
+            return []
+        self._drawn = filled
+        pygame.draw.rect(self.screen, self.bar_color, self.bar_rect, width=1)
+        fill_rect = self.bar_rect.inflate(-4, -4)
+        fill_rect.w = max(filled - 4, 0)
+        self.screen.fill(self.bar_color, fill_rect)
+        return [self.bar_rect]
+
+    def dirty_all_sprites(self):
+        self._drawn = -1
+
+
+__all__ = [
+    "Preloader",
+    "LoadingScene",
+]
@@ -0,0 +1,162 @@
+import array
+import enum
+import json
+import pathlib
+import tempfile
+import time
+from typing import Dict
+
+from . import _conf, const
+from .logs import logger
+
+
+class Phase(enum.IntEnum):
+    EVENTS = 0
+    UPDATE = 1
+    DRAW = 2
+    SCALE = 3
+    FLIP = 4
+
+
+_PHASES = len(Phase)
+
+
+class FrameProfiler:
+    """Records per-frame timings for each phase of the game loop
+
+    Timings are stored in nanoseconds in preallocated ring buffers, so
+    recording a frame doesn't allocate. Only the most recent frames (up to
+    the configured capacity) are kept.
+
+    Time spent waiting on the frame rate limit isn't attributed to any phase,
+    so a frame overruns its budget only when the work done in the frame
+    takes longer than the frame time for the target frame rate.
+
+    Args:
+        capacity (int): number of frames to keep
+        framerate (int): target frame rate used to compute the frame budget.
+            if 0, frames are never counted as overrunning
+    """
+
+    def __init__(self, capacity: int = const.DEFAULT_PROFILE_FRAMES, framerate=0):
+        self.capacity = max(capacity, 1)
+        self.budget_ns = int(1e9 / framerate) if framerate > 0 else 0
+        self.frames = 0
+        self._timings = array.array("q", bytes(8 * self.capacity * _PHASES))
+        self._starts = array.array("q", bytes(8 * self.capacity))
+        self._offset = 0
+        self._mark = 0
+
+    def begin_frame(self):
+        now = time.perf_counter_ns()
+        self._offset = (self.frames % self.capacity) * _PHASES
+        self._starts[self.frames % self.capacity] = now
+        self._mark = now
+
+    def mark(self, phase: Phase):
+        """Records the time since the last mark as the given phase"""
+        now = time.perf_counter_ns()
+        self._timings[self._offset + phase] = now - self._mark
+        self._mark = now
+
+    def idle(self):
+        """Excludes the time since the last mark from all phases"""
+        self._mark = time.perf_counter_ns()
+
+    def end_frame(self):
+        self.frames += 1
+
+    def _recorded(self) -> int:
+        return min(self.frames, self.capacity)
+
+    def phase_times(self, phase: Phase) -> array.array:
+        """Returns recorded times for a phase in nanoseconds, in no order"""
+        n = self._recorded()
+        return self._timings[phase : n * _PHASES : _PHASES]
+
+    def frame_times(self) -> array.array:
+        """Returns recorded frame times in nanoseconds, excluding idle time"""
+        n = self._recorded()
+        totals = array.array("q", bytes(8 * n))
+        for i in range(n):
+            offset = i * _PHASES
+            totals[i] = sum(self._timings[offset : offset + _PHASES])
+        return totals
+
+    @property
+    def overruns(self) -> int:
+        """Number of recorded frames that took longer than the frame budget"""
+        if not self.budget_ns:
+            return 0
+        return sum(1 for t in self.frame_times() if t > self.budget_ns)
+
+    def percentiles(self, phase: Phase | None = None) -> Dict[str, float]:
+        """Returns p50, p95 and p99 timings in milliseconds
+
+        Args:
+            phase (Phase | None): phase to report on, or None for whole frames
+        """
+        times = sorted(self.frame_times() if phase is None else self.phase_times(phase))
+        if not times:
+            return {"p50": 0, "p95": 0, "p99": 0}
+        return {
+            f"p{p}": times[min(len(times) * p // 100, len(times) - 1)] / 1e6
+            for p in (50, 95, 99)
+        }
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns percentiles for each phase and for whole frames"""
+        summary = {phase.name.lower(): self.percentiles(phase) for phase in Phase}
+        summary["frame"] = self.percentiles()
+        return summary
+
+    def dump(self, path: str | pathlib.PurePath | None = None) -> pathlib.PurePath:
+        """Writes recorded frames as a Chrome trace (chrome://tracing) JSON file
+
+        Args:
+            path (str | pathlib.PurePath | None): file to write. by default,
+                a timestamped file in the game data directory
+
+        Returns:
+            pathlib.PurePath: path of the written trace
+        """
+        if path is None:
+            data_dir = _conf.GAME.data_dir or pathlib.PurePath(tempfile.gettempdir())
+            path = (
+                data_dir / "profiles" / f"frames-{time.strftime('%Y%m%d-%H%M%S')}.json"
+            )
+        path = pathlib.Path(path)
+
+        events = []
+        n = self._recorded()
+        # the oldest frame is at the current write position once the
+        # ring buffer has wrapped around
+        first = self.frames % self.capacity if self.frames > self.capacity else 0
+        for i in range(n):
+            idx = (first + i) % self.capacity
+            ts = self._starts[idx]
+            for phase in Phase:
+                duration = self._timings[idx * _PHASES + phase]
+                events.append(
+                    {
+                        "name": phase.name.lower(),
+                        "ph": "X",
+                        "ts": ts / 1000,
+                        "dur": duration / 1000,
+                        "pid": 0,
+                        "tid": 0,
+                    }
+                )
+                ts += duration
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logger.info("Wrote frame profile to %s", path)
+        return path
+
+
+__all__ = [
+    "Phase",
+    "FrameProfiler",
+]
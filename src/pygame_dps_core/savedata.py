@@ -0,0 +1,333 @@
+import dataclasses
+import enum
+import lzma
+import marshal
+import mmap
+import os
+import pathlib
+import struct
+import zlib
+from typing import Any, Dict, Iterator
+
+import pygame
+
+from . import _conf, const, io
+from .logs import logger
+
+# file layout: a fixed size header, then chunk payloads, then an index of
+# the chunks. the header points to the current index, so a save can append
+# changed chunks and a new index and only then update the header; until it
+# does, the file still reads as the previous save
+_MAGIC = b"DPSV"
+_VERSION = 1
+# magic, version, flags, index offset, index size, index crc32
+_HEADER = struct.Struct("<4sHHQII")
+# name length, offset, stored size, raw size, compression, crc32 of the
+# stored payload. followed by the name as UTF-8
+_ENTRY = struct.Struct("<HQIIBI")
+
+
+class Compression(enum.Enum):
+    NONE = "none"
+    # fast, for chunks that change every save
+    ZLIB = "zlib"
+    # smaller but slower, for large chunks that rarely change
+    LZMA = "lzma"
+
+
+_COMPRESSION_IDS = {Compression.NONE: 0, Compression.ZLIB: 1, Compression.LZMA: 2}
+_COMPRESSIONS = {v: k for k, v in _COMPRESSION_IDS.items()}
+
+
+@dataclasses.dataclass
+class _Chunk:
+    compression: Compression
+    crc: int
+    raw_size: int
+    # where the stored payload is in the file, if it has been saved
+    offset: int = -1
+    size: int = 0
+    # stored payload waiting to be written
+    pending: bytes | None = None
+
+
+class SaveData:
+    """Save file made of named chunks, eg. one per level or system
+
+    Chunks hold bytes, or values that can be serialized with marshal (builtin
+    types like dicts, lists, strings and numbers). Each chunk is compressed
+    and checksummed separately. Only open save files from trusted sources:
+    marshal isn't safe against malformed or malicious data, and checksums
+    only catch accidental corruption.
+
+    Reading maps the file into memory, so loading a chunk only reads that
+    chunk from disk. Saving only writes chunks that changed: they are
+    appended to the file along with a new index. Once enough of the file is
+    taken up by replaced chunks, it's rewritten without them.
+
+    Args:
+        path (str | os.PathLike): save file path, relative to the saves
+            directory in the game data directory
+        compression (Compression): default compression for new chunks
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        compression: Compression = Compression.ZLIB,
+    ):
+        if _conf.GAME.data_dir is None:
+            raise pygame.error("No data directory to store save data in")
+        self.path = pathlib.Path(_conf.GAME.data_dir / const.SAVE_DATA_DIR / path)
+        self.compression = compression
+        self._removed = False
+        self._file = None
+        self._map: mmap.mmap | None = None
+        self._chunks = self._open()
+
+    def __enter__(self) -> "SaveData":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._chunks
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._chunks))
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes that haven't been saved"""
+        return self._removed or any(
+            c.pending is not None for c in self._chunks.values()
+        )
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Returns the value stored in a chunk"""
+        if name not in self._chunks:
+            return default
+        return marshal.loads(self.get_bytes(name))
+
+    def get_bytes(self, name: str) -> bytes:
+        chunk = self._chunks[name]
+        if chunk.pending is not None:
+            stored = chunk.pending
+        else:
+            assert self._map is not None
+            stored = self._map[chunk.offset : chunk.offset + chunk.size]
+            if zlib.crc32(stored) != chunk.crc:
+                raise pygame.error(f"Save data chunk {name} in {self.path} is corrupt")
+        return _decompress(stored, chunk.compression)
+
+    def set(self, name: str, value: Any, compression: Compression | None = None):
+        """Stores a value in a chunk, replacing what was there"""
+        self.set_bytes(name, marshal.dumps(value), compression)
+
+    def set_bytes(self, name: str, data: bytes, compression: Compression | None = None):
+        if compression is None:
+            compression = self.compression
+        existing = self._chunks.get(name)
+        if (
+            existing is not None
+            and existing.compression is compression
+            and existing.raw_size == len(data)
+            and self.get_bytes(name) == data
+        ):
+            # unchanged, so the chunk doesn't need to be written again
+            return
+        stored = _compress(data, compression)
+        self._chunks[name] = _Chunk(
+            compression, zlib.crc32(stored), len(data), pending=stored
+        )
+
+    def remove(self, name: str):
+        if self._chunks.pop(name, None) is not None:
+            self._removed = True
+
+    def save(self):
+        """Writes changed chunks to the save file"""
+        if not self.dirty and self._map is not None:
+            return
+        pending = sum(len(c.pending) for c in self._chunks.values() if c.pending)
+        live = sum(c.size for c in self._chunks.values() if c.pending is None)
+        file_size = len(self._map) if self._map is not None else 0
+        # bytes taken up by replaced chunks and old indexes
+        dead = file_size - _HEADER.size - live
+        if self._map is None or dead > max(live + pending, const.SAVE_DATA_MIN_DEAD):
+            self._rewrite()
+        else:
+            self._append()
+        self._removed = False
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> Dict[str, _Chunk]:
+        """Maps the save file into memory and returns its index"""
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return {}
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return _read_index(self._map, self.path)
+        except (ValueError, KeyError, OSError, struct.error) as e:
+            self.close()
+            raise pygame.error(f"Failed to read save data {self.path}: {e}") from e
+
+    def _reopen(self, saved: bool):
+        if saved:
+            self._chunks = self._open()
+        else:
+            # the file is unchanged, so keep the unsaved changes
+            self._open()
+
+    def _reopen_after_error(self):
+        # called while handling a failed write, which is the error worth
+        # raising if the file can't be reopened either
+        try:
+            self._reopen(False)
+        except Exception as e:
+            logger.error("Failed to reopen save data %s: %s", self.path, e)
+
+    def _append(self):
+        assert self._map is not None
+        end = offset = len(self._map)
+        changed = [c for c in self._chunks.values() if c.pending is not None]
+        offsets = {}
+        for chunk in changed:
+            offsets[id(chunk)] = offset
+            offset += len(chunk.pending or b"")
+        index = _pack_index(self._chunks, offsets)
+
+        self.close()
+        try:
+            with open(self.path, "r+b") as f:
+                f.seek(end)
+                for chunk in changed:
+                    f.write(chunk.pending or b"")
+                f.write(index)
+                f.flush()
+                os.fsync(f.fileno())
+                # the new chunks are only used once the header points to them
+                f.seek(0)
+                f.write(_pack_header(offset, index))
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            self._reopen_after_error()
+            raise
+        self._reopen(True)
+        logger.debug("Saved %d changed chunks to %s", len(changed), self.path)
+
+    def _rewrite(self):
+        stored = []
+        offsets = {}
+        offset = _HEADER.size
+        for chunk in self._chunks.values():
+            if chunk.pending is None:
+                assert self._map is not None
+                data = self._map[chunk.offset : chunk.offset + chunk.size]
+            else:
+                data = chunk.pending
+            stored.append(data)
+            offsets[id(chunk)] = offset
+            offset += len(data)
+        index = _pack_index(self._chunks, offsets)
+        header = _pack_header(offset, index)
+
+        self.close()
+        try:
+            io.write_atomic(self.path, b"".join((header, *stored, index)))
+        except BaseException:
+            self._reopen_after_error()
+            raise
+        self._reopen(True)
+        logger.debug("Wrote save data %s", self.path)
+
+
+def _compress(data: bytes, compression: Compression) -> bytes:
+    match compression:
+        case Compression.ZLIB:
+            return zlib.compress(data)
+        case Compression.LZMA:
+            return lzma.compress(data)
+    return data
+
+
+def _decompress(stored: bytes, compression: Compression) -> bytes:
+    match compression:
+        case Compression.ZLIB:
+            return zlib.decompress(stored)
+        case Compression.LZMA:
+            return lzma.decompress(stored)
+    return stored
+
+
+def _pack_header(index_offset: int, index: bytes) -> bytes:
+    return _HEADER.pack(
+        _MAGIC, _VERSION, 0, index_offset, len(index), zlib.crc32(index)
+    )
+
+
+def _pack_index(chunks: Dict[str, _Chunk], offsets: Dict[int, int]) -> bytes:
+    # offsets of chunks being written, by chunk id
+    parts = []
+    for name, chunk in chunks.items():
+        encoded = name.encode()
+        if chunk.pending is not None:
+            offset, size = offsets[id(chunk)], len(chunk.pending)
+        else:
+            offset, size = offsets.get(id(chunk), chunk.offset), chunk.size
+        parts.append(
+            _ENTRY.pack(
+                len(encoded),
+                offset,
+                size,
+                chunk.raw_size,
+                _COMPRESSION_IDS[chunk.compression],
+                chunk.crc,
+            )
+        )
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def _read_index(data: mmap.mmap, path: pathlib.Path) -> Dict[str, _Chunk]:
+    magic, version, _, index_offset, index_size, index_crc = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("not a save data file")
+    if version > _VERSION:
+        raise ValueError(f"unsupported version {version}")
+    index = data[index_offset : index_offset + index_size]
+    if len(index) != index_size or zlib.crc32(index) != index_crc:
+        raise ValueError("index is corrupt")
+
+    chunks = {}
+    pos = 0
+    while pos < index_size:
+        name_size, offset, size, raw_size, compression, crc = _ENTRY.unpack_from(
+            index, pos
+        )
+        pos += _ENTRY.size
+        name = index[pos : pos + name_size].decode()
+        pos += name_size
+        chunks[name] = _Chunk(_COMPRESSIONS[compression], crc, raw_size, offset, size)
+    logger.debug("Read %d chunks from save data %s", len(chunks), path)
+    return chunks
+
+
+__all__ = [
+    "Compression",
+    "SaveData",
+]
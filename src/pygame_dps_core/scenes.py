@@ -4,7 +4,7 @@ from typing import List
 
 import pygame
 
-from . import io
+from . import io, metrics
 
 
 class Scene(io.Loadable, abc.ABC):
@@ -27,7 +27,15 @@ class Scene(io.Loadable, abc.ABC):
         pygame.display.update()
 
     @abc.abstractmethod
-    def draw(self) -> List[pygame.Rect]:
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
+        """Draws the scene and returns the areas of the screen that changed
+
+        Args:
+            alpha (float | None): when the game runs with a fixed timestep,
+                how far the current frame is between the last update and the
+                next one (0 to 1) for interpolating positions. draw() is
+                called with no arguments when the fixed timestep is disabled
+        """
         pass
 
     @abc.abstractmethod
@@ -62,8 +70,10 @@ class Overlay(Scene):
     def update(self, dt: float):
         self._active_scene.update(dt)
 
-    def draw(self) -> List[pygame.Rect]:
-        return self._active_scene.draw()
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
+        if alpha is None:
+            return self._active_scene.draw()
+        return self._active_scene.draw(alpha)
 
     def dirty_all_sprites(self):
         pass
@@ -72,6 +82,12 @@ class Overlay(Scene):
 __scenes: deque[Scene] = deque()
 
 
+metrics.registry.gauge("scenes.depth", lambda: len(__scenes))
+metrics.registry.gauge(
+    "scenes.active", lambda: type(__scenes[0]).__name__ if __scenes else None
+)
+
+
 def get_active_scene() -> Scene:
     """Returns the currently active scene"""
     if not __scenes:
@@ -81,6 +97,8 @@ def get_active_scene() -> Scene:
 
 def new_scene(scene: Scene):
     """Starts a new scene as the active scene"""
+    # keep loaded scenes cached while they're on the stack
+    io.registry.acquire(scene)
     scene._on_enter()
     __scenes.appendleft(scene)
 
@@ -89,15 +107,36 @@ def end_current_scene() -> Scene:
     """Ends the currently active scene and returns the next in the stack"""
     ending_scene = __scenes.popleft()
     ending_scene.reset()
+    # let go of assets loaded for the scene once nothing else uses them
+    io.registry.release(ending_scene)
     active_scene = get_active_scene()
     # XXX: should _on_enter only run when the Scene is first loaded?
     active_scene._on_enter()
     return active_scene
 
 
+def replace_scene(scene: Scene) -> Scene:
+    """Ends the currently active scene and starts a new one in its place"""
+    ending_scene = __scenes.popleft()
+    ending_scene.reset()
+    io.registry.release(ending_scene)
+    new_scene(scene)
+    return scene
+
+
+def end_all_scenes():
+    """Ends every scene in the stack, eg. when the game stops"""
+    while __scenes:
+        ending_scene = __scenes.popleft()
+        ending_scene.reset()
+        io.registry.release(ending_scene)
+
+
 __all__ = [
     "Scene",
     "get_active_scene",
     "new_scene",
     "end_current_scene",
+    "replace_scene",
+    "end_all_scenes",
 ]
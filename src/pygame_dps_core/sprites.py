@@ -1,9 +1,10 @@
 import dataclasses
-from typing import Dict, List
+import weakref
+from typing import Dict, List, Type
 
 import pygame
 
-from . import io, types
+from . import const, io, types
 
 
 @dataclasses.dataclass(frozen=True)
@@ -13,6 +14,8 @@ class SpriteOptions(io.Configurable):
     height: float = 0
     image: pygame.Surface | None = None
     layer: int = 0
+    # draw the image from its bounding rect, skipping transparent edges
+    trim: bool = True
 
 
 @dataclasses.dataclass(frozen=True)
@@ -29,29 +32,145 @@ class SpriteSheetSettings(io.Configurable):
     animation_opts: List[AnimationOptions]
 
 
-class GameSprite(pygame.sprite.WeakDirtySprite):
+# bounding rects of sprite images. images are treated as immutable once
+# sprites use them, as shared assets are, so each is only scanned once
+_bounds: weakref.WeakKeyDictionary[pygame.Surface, pygame.Rect] = (
+    weakref.WeakKeyDictionary()
+)
 
-    def __init__(self, opts: SpriteOptions):
-        super().__init__()
-        self._layer = opts.layer
-        self.origin = opts.topleft
-        image_size = (opts.width, opts.height)
-        self.image = opts.image if opts.image else pygame.Surface(image_size)
 
-        # source image from its bounding rect
-        # (inner rect at first non-transparent pixels)
-        self.source_rect = self.image.get_bounding_rect()
-        self.rect = self.image.get_rect()
-        self.rect.update(self.origin, self.source_rect.size)
+def bounding_rect(image: pygame.Surface) -> pygame.Rect:
+    """Returns the rect around the image's non-transparent pixels
 
-        # store last x, y position for use in collision detection
-        self.last_pos: types.Coordinate = self.rect.topleft
+    The result is cached for as long as the image is alive, as finding it
+    scans every pixel. Images that are drawn on after being used for a
+    sprite should be used with trim=False instead.
+    """
+    return _bounding_rect(image).copy()
+
+
+def _bounding_rect(image: pygame.Surface) -> pygame.Rect:
+    rect = _bounds.get(image)
+    if rect is None:
+        rect = _bounds[image] = image.get_bounding_rect()
+    return rect
+
+
+class LightSprite(pygame.sprite.DirtySprite):
+    """Sprite for short-lived images, such as text and particles
+
+    Created from an image directly rather than from SpriteOptions, and can be
+    given a new image with set_image(), so sprites can be reused (see
+    SpritePool) rather than allocated every frame.
+
+    Args:
+        image (pygame.Surface): image to draw
+        topleft (types.Coordinate): position of the sprite
+        layer (int): layer in layered groups
+        trim (bool): draw the image from its bounding rect (inner rect at
+            first non-transparent pixels), skipping transparent edges
+    """
+
+    # pygame's sprite classes don't use slots, so attributes they set still go
+    # in the instance dict
+    __slots__ = ("origin", "last_pos")
+
+    def __init__(
+        self,
+        image: pygame.Surface,
+        topleft: types.Coordinate = (0, 0),
+        layer: int = 0,
+        trim: bool = True,
+    ):
+        super().__init__()
+        self._layer = layer
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.source_rect = pygame.Rect(0, 0, 0, 0)
+        self.set_image(image, topleft, trim)
+
+    def set_image(
+        self, image: pygame.Surface, topleft: types.Coordinate, trim: bool = True
+    ):
+        """Replaces the sprite's image and moves it, reusing its rects"""
+        self.image = image
+        self.origin = topleft
+        if trim:
+            self.source_rect.update(_bounding_rect(image))
+        else:
+            self.source_rect.update((0, 0), image.get_size())
+        self.dirty = 1
+        self.reset()
 
     def reset(self):
         self.rect.update(self.origin, self.source_rect.size)
+        # store last x, y position for use in collision detection
         self.last_pos = self.rect.topleft
 
 
+class GameSprite(LightSprite, pygame.sprite.WeakDirtySprite):
+    """Sprite configured with SpriteOptions
+
+    Groups are referenced weakly, so a group that's only referenced by its
+    sprites is freed.
+    """
+
+    def __init__(self, opts: SpriteOptions):
+        image_size = (opts.width, opts.height)
+        image = opts.image if opts.image else pygame.Surface(image_size)
+        super().__init__(image, opts.topleft, opts.layer, opts.trim)
+
+
+class SpritePool:
+    """Recycles sprites for images that change often, eg. text and particles
+
+    Take sprites from the pool with acquire(), and give them back with
+    release() once they're no longer needed, eg. when a line of text is
+    rendered again in the next frame. Released sprites are removed from their
+    groups and reused by later calls to acquire(), so no new sprites are
+    allocated once the pool has warmed up.
+
+    Args:
+        size (int): most released sprites to keep. sprites released while
+            the pool is full are left to be freed
+    """
+
+    def __init__(self, size: int = const.DEFAULT_SPRITE_POOL_SIZE):
+        self.size = size
+        self._free: List[LightSprite] = []
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(
+        self,
+        image: pygame.Surface,
+        topleft: types.Coordinate = (0, 0),
+        layer: int = 0,
+        trim: bool = True,
+    ) -> LightSprite:
+        """Returns a released sprite with a new image, or a new sprite"""
+        if not self._free:
+            return LightSprite(image, topleft, layer, trim)
+        sprite = self._free.pop()
+        sprite._layer = layer
+        sprite.visible = 1
+        sprite.blendmode = 0
+        sprite.set_image(image, topleft, trim)
+        return sprite
+
+    def release(self, *sprites: LightSprite):
+        """Removes sprites from their groups and keeps them for reuse"""
+        for sprite in sprites:
+            sprite.kill()
+            # drop the image so the pool doesn't keep it alive
+            sprite.image = None
+            if len(self._free) < self.size:
+                self._free.append(sprite)
+
+    def clear(self):
+        self._free.clear()
+
+
 # TODO:
 class Animation(pygame.sprite.WeakSprite):
 
@@ -68,11 +187,13 @@ class Animation(pygame.sprite.WeakSprite):
 
 class SpriteSheet(io.Loadable):
 
-    def __init__(self, opts: SpriteSheetSettings):
-        self.sprite_sheet = opts.sprite_sheet
-        self.sprite_width = opts.sprite_width
-        self.sprite_height = opts.sprite_height
-        self.animations = self._load_animations(opts.animation_opts)
+    settings_type: Type[SpriteSheetSettings] = SpriteSheetSettings
+
+    def __init__(self, settings: SpriteSheetSettings):
+        self.sprite_sheet = settings.sprite_sheet
+        self.sprite_width = settings.sprite_width
+        self.sprite_height = settings.sprite_height
+        self.animations = self._load_animations(settings.animation_opts)
 
     def _load_animations(
         self, animation_opts: List[AnimationOptions]
@@ -1,13 +1,13 @@
 import collections
 import dataclasses
 import enum
-import functools
-import itertools
-from typing import Generator, Iterable, List, Sequence, Tuple, Type
+import pathlib
+import weakref
+from typing import Dict, Generator, Iterable, List, Sequence, Tuple, Type
 
 import pygame
 
-from . import const, io, keys, scenes, sprites, types
+from . import const, io, keys, layout, metrics, scenes, sprites, types
 
 
 class Align(enum.Enum):
@@ -60,13 +60,18 @@ class TextOptions(io.Configurable):
     bg_color: types.ColorValue | None = None
     antialias: bool = True
     justify: bool = False
+    wrap_mode: layout.WrapMode = dataclasses.field(default=layout.WrapMode.GREEDY)
     align: Align = dataclasses.field(default=Align.LEFT)
     vertical_align: VerticalAlign = dataclasses.field(default=VerticalAlign.TOP)
+    # frequently changing text (counters, timers) should skip the text
+    # cache so one-off strings don't evict surfaces that will be reused
+    cached: bool = True
 
 
 @dataclasses.dataclass(frozen=True)
 class TypewriterTextOptions(TextOptions):
     text_speed: int = const.DEFAULT_TEXT_SPEED
+    # frame time used when the typewriter is stepped without a time delta
     framerate: int = const.DEFAULT_FRAMERATE
     keepalive: float = const.DEFAULT_TYPEWRITER_KEEPALIVE
     skip: keys.KeyBinding | None = None
@@ -83,10 +88,232 @@ class TextBoxSettings(TypewriterTextOptions):
     indicator: sprites.SpriteOptions | None = None
 
 
-# TODO: wrap this in a controller so that cache settings are configurable
-# XXX: lru_cache requires all args/kwargs to be Hashable,
-# so require specific args rather than a TextOptions object
-@functools.lru_cache()
+class CachePolicy(enum.Enum):
+    LRU = "lru"
+    LFU = "lfu"
+
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+@dataclasses.dataclass
+class _CachedSurface:
+    surface: pygame.Surface
+    nbytes: int
+    uses: int = 0
+    pinned: bool = False
+
+
+# XXX: ColorValue isn't a Hashable type, so cache keys
+# use specific args with colors normalized to RGBA tuples
+_TextKey = Tuple[str, bool, Tuple[int, int, int, int], Tuple[int, int, int, int] | None]
+
+
+class TextSurfaceCache:
+    """Size-limited cache for rendered text surfaces
+
+    Entries are pooled per font and the cache size is measured in pixel bytes
+    rather than entry count, so a handful of long lines can't push out every
+    short label (or vice versa). When the cache is full, entries are evicted
+    from the pool of the font being rendered first, then from the largest of
+    the remaining pools. Pinned entries are never evicted.
+
+    Fonts are referenced weakly, so a font's pool is dropped along with the
+    font, and empty pools are dropped when their last entry is evicted.
+
+    Args:
+        max_bytes (int): maximum combined size of cached surfaces in bytes
+        policy (CachePolicy): eviction policy, least recently or least
+            frequently used
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = const.DEFAULT_TEXT_CACHE_SIZE,
+        policy: CachePolicy = CachePolicy.LRU,
+    ):
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.stats = CacheStats()
+        self._pools: weakref.WeakKeyDictionary[
+            pygame.font.Font, collections.OrderedDict[_TextKey, _CachedSurface]
+        ] = weakref.WeakKeyDictionary()
+        self._finalizers: weakref.WeakKeyDictionary[
+            pygame.font.Font, weakref.finalize
+        ] = weakref.WeakKeyDictionary()
+
+    def configure(
+        self, max_bytes: int | None = None, policy: CachePolicy | None = None
+    ):
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if policy is not None:
+            self.policy = policy
+        self._evict(0)
+
+    def get(
+        self,
+        text: str,
+        font: pygame.font.Font,
+        antialias: bool,
+        color: Tuple[int, int, int, int],
+        bg_color: Tuple[int, int, int, int] | None,
+    ) -> pygame.Surface:
+        """Returns the rendered text surface, rendering it on a cache miss"""
+        pool = self._pools.get(font, {})
+        key = (text, antialias, color, bg_color)
+        entry = pool.get(key)
+
+        if entry is not None:
+            self.stats.hits += 1
+            entry.uses += 1
+            self._pools[font].move_to_end(key)
+            return entry.surface
+
+        self.stats.misses += 1
+        surface = font.render(text, antialias, color, bg_color)
+        self._insert(font, key, surface)
+        return surface
+
+    def pin(
+        self,
+        text: str,
+        font: pygame.font.Font,
+        antialias: bool,
+        color: Tuple[int, int, int, int],
+        bg_color: Tuple[int, int, int, int] | None,
+    ) -> pygame.Surface:
+        """Renders the given text and keeps it cached until unpinned"""
+        surface = self.get(text, font, antialias, color, bg_color)
+        key = (text, antialias, color, bg_color)
+        entry = self._pools.get(font, {}).get(key)
+        if entry is None:
+            # the surface was too large to cache, so force it in
+            entry = self._insert(font, key, surface, True)
+        entry.pinned = True
+        return surface
+
+    def unpin(
+        self,
+        text: str,
+        font: pygame.font.Font,
+        antialias: bool,
+        color: Tuple[int, int, int, int],
+        bg_color: Tuple[int, int, int, int] | None,
+    ):
+        entry = self._pools.get(font, {}).get((text, antialias, color, bg_color))
+        if entry is not None:
+            entry.pinned = False
+            self._evict(0)
+
+    def clear(self, font: pygame.font.Font | None = None):
+        """Empties the cache, or only the pool for the given font"""
+        fonts = list(self._pools.keys()) if font is None else [font]
+        for f in fonts:
+            self._drop(f)
+
+    def _insert(
+        self,
+        font: pygame.font.Font,
+        key: _TextKey,
+        surface: pygame.Surface,
+        force: bool = False,
+    ) -> _CachedSurface | None:
+        nbytes = surface.get_pitch() * surface.get_height()
+        if not self._evict(nbytes, font) and not force:
+            return None
+
+        pool = self._pools.get(font)
+        if pool is None:
+            pool = self._pools[font] = collections.OrderedDict()
+            # the pool is dropped with the font, so update the stats then
+            self._finalizers[font] = weakref.finalize(font, self._forget, pool)
+        entry = _CachedSurface(surface, nbytes, uses=1)
+        pool[key] = entry
+        self.stats.entries += 1
+        self.stats.nbytes += nbytes
+        return entry
+
+    def _evict(self, nbytes: int, font: pygame.font.Font | None = None) -> bool:
+        """Frees space for nbytes, returning False if it can't be made to fit"""
+        if nbytes > self.max_bytes:
+            return False
+
+        # evict from the pool that's being added to first so that a font
+        # churning through text doesn't push other fonts out of the cache
+        if font is not None and font in self._pools:
+            self._evict_from(font, nbytes)
+        if self.stats.nbytes + nbytes > self.max_bytes:
+            pools = sorted(self._pools.items(), key=lambda p: len(p[1]), reverse=True)
+            for f, _ in pools:
+                self._evict_from(f, nbytes)
+                if self.stats.nbytes + nbytes <= self.max_bytes:
+                    break
+
+        return self.stats.nbytes + nbytes <= self.max_bytes
+
+    def _evict_from(self, font: pygame.font.Font, nbytes: int):
+        pool = self._pools[font]
+        while self.stats.nbytes + nbytes > self.max_bytes:
+            key = self._find_victim(pool)
+            if key is None:
+                break
+            entry = pool.pop(key)
+            self.stats.evictions += 1
+            self.stats.entries -= 1
+            self.stats.nbytes -= entry.nbytes
+        if not pool:
+            self._drop(font)
+
+    def _drop(self, font: pygame.font.Font):
+        pool = self._pools.pop(font, None)
+        if pool is not None:
+            self._finalizers.pop(font).detach()
+            self._forget(pool)
+
+    def _forget(self, pool: collections.OrderedDict[_TextKey, _CachedSurface]):
+        for entry in pool.values():
+            self.stats.entries -= 1
+            self.stats.nbytes -= entry.nbytes
+
+    def _find_victim(
+        self, pool: collections.OrderedDict[_TextKey, _CachedSurface]
+    ) -> _TextKey | None:
+        # pools are kept in recency order, so the first unpinned entry is the
+        # least recently used; ties in LFU mode also fall back to recency
+        victim, victim_uses = None, 0
+        for key, entry in pool.items():
+            if entry.pinned:
+                continue
+            if self.policy is CachePolicy.LRU:
+                return key
+            if victim is None or entry.uses < victim_uses:
+                victim, victim_uses = key, entry.uses
+        return victim
+
+
+text_cache = TextSurfaceCache()
+
+metrics.registry.gauge(
+    "text_cache.hit_rate", lambda: text_cache.stats.hit_rate, "{:.0%}"
+)
+metrics.registry.gauge("text_cache.entries", lambda: text_cache.stats.entries)
+metrics.registry.gauge(
+    "text_cache.size", lambda: text_cache.stats.nbytes / 1024, "{:.0f}KB"
+)
+
+
 def create_text_surface(
     text: str,
     font: pygame.font.Font,
@@ -95,39 +322,66 @@ def create_text_surface(
     bg_color: Tuple[int, int, int, int] | None,
 ) -> pygame.Surface:
     """Renders and caches text surfaces to be drawn to the screen"""
-    return font.render(text, antialias, color, bg_color)
+    return text_cache.get(text, font, antialias, color, bg_color)
 
 
-def text_sprite(
-    text: str, opts: TextOptions, dest: types.Coordinate | pygame.Rect, layer: int = 0
-) -> sprites.GameSprite:
-    # XXX: ColorValue isn't a Hashable type, so use
-    # Color.normalize() to create an RGBA tuple
+def render_text(
+    text: str, opts: TextOptions, cached: bool | None = None
+) -> pygame.Surface:
+    """Renders text with the given options, using the text cache if enabled"""
+    # use Color.normalize() to create a hashable RGBA tuple
     clr = pygame.Color(opts.color).normalize()
     bg_clr = (
         pygame.Color(opts.bg_color).normalize() if opts.bg_color is not None else None
     )
-    img = create_text_surface(text, opts.font, opts.antialias, clr, bg_clr)
-    text_w, text_h = img.get_size()
+    if cached is None:
+        cached = opts.cached
+    if cached:
+        return text_cache.get(text, opts.font, opts.antialias, clr, bg_clr)
+    return opts.font.render(text, opts.antialias, clr, bg_clr)
 
+
+def text_sprite(
+    text: str,
+    opts: TextOptions,
+    dest: types.Coordinate | pygame.Rect,
+    layer: int = 0,
+    cached: bool | None = None,
+    pool: sprites.SpritePool | None = None,
+) -> sprites.LightSprite:
+    """Renders text to a sprite, aligned in dest if it's a rect
+
+    Pass a sprite pool for text that's drawn again every frame, and release
+    the sprite back to the pool once it's replaced.
+    """
+    img = render_text(text, opts, cached)
     if isinstance(dest, pygame.Rect):
-        dx, dy = dest.topleft
+        dest = text_position(img.get_size(), opts, dest)
+    if pool is not None:
+        return pool.acquire(img, dest, layer)
+    return sprites.GameSprite(
+        opts=sprites.SpriteOptions(dest, img.get_width(), img.get_height(), img, layer)
+    )
 
-        if opts.align is Align.CENTER:
-            dx = dest.centerx - (text_w / 2)
-        elif opts.align is Align.RIGHT:
-            dx = dest.right - text_w
 
-        if opts.vertical_align is VerticalAlign.CENTER:
-            dy = dest.centery - (text_h / 2)
-        elif opts.vertical_align is VerticalAlign.BOTTOM:
-            dy = dest.bottom - text_h
+def text_position(
+    size: Tuple[int, int], opts: TextOptions, rect: pygame.Rect
+) -> types.Coordinate:
+    """Returns the position of text of the given size aligned in the rect"""
+    text_w, text_h = size
+    dx, dy = rect.topleft
 
-        dest = (dx, dy)
+    if opts.align is Align.CENTER:
+        dx = rect.centerx - (text_w / 2)
+    elif opts.align is Align.RIGHT:
+        dx = rect.right - text_w
 
-    return sprites.GameSprite(
-        opts=sprites.SpriteOptions(dest, text_w, text_h, img, layer)
-    )
+    if opts.vertical_align is VerticalAlign.CENTER:
+        dy = rect.centery - (text_h / 2)
+    elif opts.vertical_align is VerticalAlign.BOTTOM:
+        dy = rect.bottom - text_h
+
+    return (dx, dy)
 
 
 def multiline_text(
@@ -135,9 +389,13 @@ def multiline_text(
     opts: TextOptions,
     dest: pygame.Rect,
     layer: int = 0,
-) -> List[sprites.GameSprite]:
+    pool: sprites.SpritePool | None = None,
+) -> List[sprites.LightSprite]:
     prepared_texts = _prepare_multiline(text, opts, dest)
-    return [text_sprite(prep.line, opts, prep.dest, layer) for prep in prepared_texts]
+    return [
+        text_sprite(prep.line, opts, prep.dest, layer, pool=pool)
+        for prep in prepared_texts
+    ]
 
 
 def _prepare_multiline(
@@ -152,7 +410,7 @@ def _prepare_multiline(
     lines = text
     if isinstance(text, str):
         if opts.justify:
-            lines = _split_and_justify(text, opts.font, rect)
+            lines = layout.wrap(text, opts.font, rect.w, opts.wrap_mode)
         else:
             lines = text.splitlines()
 
@@ -170,25 +428,87 @@ def _prepare_multiline(
     return prepared_texts
 
 
-def _split_and_justify(
-    text: str, font: pygame.font.Font, rect: pygame.Rect
-) -> List[str]:
-    lines = []
-    line = ""
-    line_space = rect.w
-
-    for word in text.split():
-        word = f"{word} "
-        text_width, _ = font.size(word)
-        if text_width > line_space:
-            lines.append(line)
-            line = ""
-            line_space = rect.w
-        line += word
-        line_space -= text_width
-
-    lines.append(line)
-    return lines
+class _TypingLine:
+    """Reveals a pre-rendered line of text one character at a time
+
+    The full line is rendered once and the sprite image is swapped for a
+    subsurface of it that grows as characters are revealed, so typing a line
+    never re-renders text or allocates new pixel data.
+    """
+
+    def __init__(self, prepared: _PreparedText, opts: TextOptions, layer: int):
+        self.sprite = text_sprite(prepared.line, opts, prepared.dest, layer)
+        self.image = self.sprite.image
+        self.bounds = self.sprite.source_rect
+        self._line = prepared.line
+        self._font = opts.font
+        self.length = len(prepared.line)
+        # measured when the line is first revealed, as lines that are shown
+        # in full at once don't need them
+        self._offsets: List[int] | None = None
+        self.revealed = 0
+        self.reveal(0)
+
+    @property
+    def done(self) -> bool:
+        return self.revealed >= self.length
+
+    def _width(self, count: int) -> int:
+        """Returns the rendered width of the first count characters"""
+        if count <= 0:
+            return 0
+        if count >= self.length:
+            return self.image.get_width()
+        if self._offsets is None:
+            text_w = self.image.get_width()
+            self._offsets = _char_offsets(self._line, self._font, text_w)
+        return self._offsets[count - 1]
+
+    def reveal(self, count: int):
+        self.revealed = min(count, self.length)
+        width = self._width(self.revealed)
+        self.sprite.image = self.image.subsurface(
+            (0, 0, width, self.image.get_height())
+        )
+        self.sprite.source_rect = self.bounds.clip(self.sprite.image.get_rect())
+        self.sprite.rect.size = self.sprite.source_rect.size
+        self.sprite.dirty = 1
+
+    def finish(self):
+        """Shows the whole line with the full rendered image"""
+        self.revealed = self.length
+        self.sprite.image = self.image
+        self.sprite.source_rect = self.bounds
+        self.sprite.rect.size = self.bounds.size
+        self.sprite.dirty = 1
+
+
+def _char_offsets(line: str, font: pygame.font.Font, max_width: int) -> List[int]:
+    """Returns the rendered width of the line up to and including each character"""
+    # XXX: measuring every prefix is exact, but O(n²) in the line length.
+    # advances from font.metrics() ignore kerning and are rounded, drifting
+    # several pixels over a line. instead, measure each character next to
+    # the one before it, which includes kerning, and scale the sum to the
+    # width of the whole line so rounding doesn't add up. offsets end up
+    # within a couple of pixels of the prefix widths
+    if not line:
+        return []
+    advances = [font.size(line[0])[0]]
+    prev_width = advances[0]
+    for i in range(1, len(line)):
+        width = font.size(line[i])[0]
+        advances.append(font.size(line[i - 1 : i + 1])[0] - prev_width)
+        prev_width = width
+
+    total = sum(advances)
+    scale = font.size(line)[0] / total if total > 0 else 0
+    offsets = []
+    pen = offset = 0
+    for advance in advances:
+        pen += advance
+        offset = max(offset, min(round(pen * scale), max_width))
+        offsets.append(offset)
+    return offsets
 
 
 def typewriter(
@@ -196,7 +516,13 @@ def typewriter(
     opts: TypewriterTextOptions,
     dest: pygame.Rect,
     group: pygame.sprite.LayeredUpdates | None = None,
-) -> Generator[Tuple[pygame.sprite.LayeredUpdates, bool], None, None]:
+) -> Generator[Tuple[pygame.sprite.LayeredUpdates, bool], float | None, None]:
+    """Types text out over time, yielding the group to draw each frame
+
+    Send the elapsed time in seconds to advance the typewriter by real time.
+    If the generator is advanced with next(), each step is treated as one
+    frame at opts.framerate.
+    """
     group = group or pygame.sprite.LayeredUpdates()
     text_layer = 0
 
@@ -208,52 +534,153 @@ def typewriter(
     else:
         prepared_texts = collections.deque(text)
 
-    text_sprites = [
-        text_sprite(prep.line, opts, prep.dest, text_layer) for prep in prepared_texts
-    ]
-
-    text_speed = pygame.math.clamp(opts.text_speed, 0, const.MAX_TEXT_SPEED)
-    if text_speed > 0:
+    # each line is rendered once, when it starts typing. finished lines keep
+    # their sprites for the final group
+    lines: List[_TypingLine] = []
+    dt = None
+    chars_per_second = _chars_per_second(opts)
+    if chars_per_second > 0 and prepared_texts:
         tmp_group = group.copy()
-        # store prepared_texts and line indices and track the
-        # number of frames to wait to print each character
-        # based on configured framerate and text speed
-        char_idx = step_frames = 0
-        current = prepared_texts.popleft()
-        line = ""
-
-        while prepared_texts or len(line) < len(current.line):
+        typing = _TypingLine(prepared_texts.popleft(), opts, text_layer + 1)
+        lines.append(typing)
+        # write the typing line to its own layer so it stays on top
+        tmp_group.add(typing.sprite)
+        chars_due = 0.0
+
+        while prepared_texts or not typing.done:
             if opts.skip and opts.skip.is_pressed():
                 break
 
-            # remove the currently typing line from the group
-            tmp_group.remove_sprites_of_layer(text_layer + 1)
+            # reveal as many characters as the elapsed time allows
+            chars_due += _frame_time(dt, opts) * chars_per_second
+            while chars_due >= 1 and (prepared_texts or not typing.done):
+                if typing.done:
+                    # the finished line is already fully rendered, so move it
+                    # down to the text layer rather than creating a new sprite
+                    tmp_group.change_layer(typing.sprite, text_layer)
+                    typing = _TypingLine(prepared_texts.popleft(), opts, text_layer + 1)
+                    lines.append(typing)
+                    tmp_group.add(typing.sprite)
+                    continue
+                count = min(int(chars_due), typing.length - typing.revealed)
+                typing.reveal(typing.revealed + count)
+                chars_due -= count
+
+            dt = yield tmp_group, False
+
+    # lines that weren't typed, eg. when skipped, are shown in full at once
+    lines.extend(_TypingLine(prep, opts, text_layer) for prep in prepared_texts)
+    for line in lines:
+        line.finish()
+    group.add(*(line.sprite for line in lines), layer=text_layer)
+
+    keepalive = opts.keepalive
+    # special case - if keepalive is set to 0, continue to yield indefinitely
+    wait_forever = keepalive == 0
+    while wait_forever or keepalive > 0:
+        dt = yield group, True
+        keepalive -= _frame_time(dt, opts)
 
-            if len(line) == len(current.line):
-                tmp_group.add(text_sprite(current.line, opts, current.dest, text_layer))
-                current = prepared_texts.popleft()
-                line = ""
-                char_idx = 0
 
-            if step_frames == 0:
-                line += current.line[char_idx]
-                char_idx += 1
-                # XXX: should the multiplier here be configurable?
-                step_frames = opts.framerate // (text_speed * 6)
-            step_frames -= 1
+def _chars_per_second(opts: TypewriterTextOptions) -> float:
+    text_speed = pygame.math.clamp(opts.text_speed, 0, const.MAX_TEXT_SPEED)
+    return text_speed * const.TEXT_SPEED_CHARS_PER_SECOND
+
+
+def _frame_time(dt: float | None, opts: TypewriterTextOptions) -> float:
+    if dt is None:
+        return 1 / opts.framerate
+    # cap catch-up after a long frame so text doesn't jump ahead
+    return min(dt, const.MAX_TYPEWRITER_CATCHUP)
+
+
+class _TextLine(pygame.sprite.DirtySprite):
+    """Reusable sprite for a single line of a text box
+
+    The line image lives as long as the text box. Text is rendered once per
+    line and copied into the image as it's revealed, so typing only blits
+    the newly revealed columns and only this line's rect is redrawn.
+    """
+
+    def __init__(self, size: Tuple[int, int], layer: int):
+        super().__init__()
+        self._layer = layer
+        self.image = pygame.Surface(size, pygame.SRCALPHA)
+        self.rect = self.image.get_rect()
+        self.revealed = 0
+        self.length = 0
+        self._line = ""
+        self._font: pygame.font.Font | None = None
+        # measured when the line is first revealed, as lines that are shown
+        # in full at once don't need them
+        self._offsets: List[int] | None = None
+        self._rendered: pygame.Surface | None = None
+        self._text_pos = (0, 0)
+
+    @property
+    def done(self) -> bool:
+        return self.revealed >= self.length
+
+    def set_text(self, prepared: _PreparedText, opts: TextOptions):
+        self.clear()
+        self.rect.topleft = pygame.Rect(prepared.dest).topleft
+        self._rendered = render_text(prepared.line, opts)
+        text_w, text_h = self._rendered.get_size()
+        self._line = prepared.line
+        self._font = opts.font
+        self.length = len(prepared.line)
+
+        x = y = 0
+        if opts.align is Align.CENTER:
+            x = (self.rect.w - text_w) // 2
+        elif opts.align is Align.RIGHT:
+            x = self.rect.w - text_w
+        if opts.vertical_align is VerticalAlign.CENTER:
+            y = (self.rect.h - text_h) // 2
+        elif opts.vertical_align is VerticalAlign.BOTTOM:
+            y = self.rect.h - text_h
+        # match text_sprite, which draws text from its bounding rect
+        bounds = self._rendered.get_bounding_rect()
+        self._text_pos = (x - bounds.x, y - bounds.y)
+
+    def _width(self, count: int) -> int:
+        """Returns the rendered width of the first count characters"""
+        assert self._rendered is not None and self._font is not None
+        if count <= 0:
+            return 0
+        if count >= self.length:
+            return self._rendered.get_width()
+        if self._offsets is None:
+            text_w = self._rendered.get_width()
+            self._offsets = _char_offsets(self._line, self._font, text_w)
+        return self._offsets[count - 1]
+
+    def reveal(self, count: int):
+        count = min(count, self.length)
+        if self._rendered is None or count <= self.revealed:
+            return
 
-            # write the typing line to its own layer so we can replace it
-            tmp_group.add(text_sprite(line, opts, current.dest, text_layer + 1))
-            yield tmp_group, False
+        start = self._width(self.revealed)
+        end = self._width(count)
+        x, y = self._text_pos
+        area = (start, 0, end - start, self._rendered.get_height())
+        self.image.blit(self._rendered, (x + start, y), area)
+        self.revealed = count
+        self.dirty = 1
 
-    group.add(*text_sprites)
+    def reveal_all(self):
+        self.reveal(self.length)
 
-    keepalive = int(opts.keepalive * opts.framerate)
-    # special case - if keepalive is set to 0, continue to yield indefinitely
-    wait_forever = keepalive == 0
-    while wait_forever or keepalive > 0:
-        yield group, True
-        keepalive = max(keepalive - 1, 0)
+    def clear(self):
+        if self._rendered is None:
+            return
+        self.image.fill((0, 0, 0, 0))
+        self.revealed = 0
+        self.length = 0
+        self._rendered = None
+        self._font = None
+        self._offsets = None
+        self.dirty = 1
 
 
 class TextBox(scenes.Overlay):
@@ -263,8 +690,8 @@ class TextBox(scenes.Overlay):
     def __init__(self, settings: TextBoxSettings, screen: pygame.Surface):
         super().__init__(screen)
         self.settings = settings
-        self._auto_scroll_timer = int(settings.auto_scroll * settings.framerate)
-        self.auto_scroll = self._auto_scroll_timer > 0
+        self._auto_scroll_timer = settings.auto_scroll
+        self.auto_scroll = settings.auto_scroll > 0
 
         self.text_box = sprites.GameSprite(opts=settings.box_sprite)
         self.indicator = None
@@ -280,57 +707,126 @@ class TextBox(scenes.Overlay):
             self.draw_group.add(self.indicator)
             self.indicator.visible = False
 
+        # keep one sprite per line of the text box. pages are written into
+        # the existing line images rather than creating new sprites
+        line_height = settings.font.get_linesize()
+        lines_per_page = max(self.text_rect.h // line_height, 1)
+        text_layer = self.draw_group.get_top_layer() + 1
+        self.lines = [
+            _TextLine((self.text_rect.w, line_height), text_layer)
+            for _ in range(lines_per_page)
+        ]
+        self.draw_group.add(*self.lines)
+
         self._text_windows = collections.deque()
-        self.writer = None
+        self._baked: Dict[str, layout.Pages] = {}
+        self._page: collections.deque[_PreparedText] | None = None
+        self._typing = 0
+        self._chars_due = 0.0
+        self._keepalive = 0.0
 
     def add_text(self, text: str):
         if not text:
             return
 
-        if self.settings.justify:
-            lines = _split_and_justify(text, self.settings.font, self.text_rect)
-        else:
-            lines = text.splitlines()
-
-        lines_per_block = self.text_rect.h // self.settings.font.get_linesize()
-        blocks = itertools.batched(lines, lines_per_block)
-        for block in blocks:
+        pages = self._baked.get(text)
+        if pages is None:
+            pages = layout.paginate(
+                text,
+                self.settings.font,
+                self.text_rect.size,
+                self.settings.justify,
+                self.settings.wrap_mode,
+            )
+        for page in pages:
             self._text_windows.append(
-                _prepare_multiline(block, self.settings, self.text_rect)
+                _prepare_multiline(page, self.settings, self.text_rect)
             )
 
-        if self.writer is None:
-            self._new_writer(self._text_windows.popleft())
+        if self._page is None and self._text_windows:
+            self._show_page(self._text_windows.popleft())
+
+    def bake(self, dialogue_file: str | pathlib.PurePath):
+        """Loads pre-computed pages for all text in a dialogue file
 
-    def _new_writer(self, text: str):
-        self.writer = typewriter(text, self.settings, self.text_rect, self.draw_group)
+        Text added from the file afterwards is displayed without being
+        measured or wrapped again. See layout.bake for the file format.
+        """
+        self._baked.update(
+            layout.bake(
+                dialogue_file,
+                self.settings.font,
+                self.text_rect.size,
+                self.settings.justify,
+                self.settings.wrap_mode,
+            )
+        )
+
+    @property
+    def finished_typing(self) -> bool:
+        return self._page is not None and self._typing >= len(self._page)
+
+    def _show_page(self, page: collections.deque[_PreparedText]):
+        self._page = page
+        self._typing = 0
+        self._chars_due = 0.0
+        self._keepalive = self.settings.keepalive
+
+        for i, line in enumerate(self.lines):
+            if i < len(page):
+                line.set_text(page[i], self.settings)
+            else:
+                line.clear()
+        self._skip_typed_lines()
+
+    def _skip_typed_lines(self):
+        # move past finished (or empty) lines to the next line to type
+        while not self.finished_typing and self.lines[self._typing].done:
+            self._typing += 1
 
     def update(self, dt: float):
-        if self.writer is None:
+        if self._page is None:
             return
 
-        try:
-            self.draw_group, finished_typing = next(self.writer)
-
-            if finished_typing:
-                self._auto_scroll_timer -= 1
+        dt = _frame_time(dt, self.settings)
+        if not self.finished_typing:
+            self._type(dt)
+        else:
+            self._auto_scroll_timer -= dt
 
-                if self.indicator is not None:
-                    # TODO: indicator animation
-                    self.indicator.visible = True
-                    self.indicator.dirty = 1
+            if self.indicator is not None and not self.indicator.visible:
+                # TODO: indicator animation
+                self.indicator.visible = True
+                self.indicator.dirty = 1
 
-                if self._should_advance():
-                    self._advance()
-            else:
-                # if we're still typing, the top sprite will be the
-                # incomplete line - dirty it on each tick
-                self.draw_group.get_top_sprite().dirty = 1
-        except StopIteration:
-            self._advance()
+            # special case - if keepalive is set to 0, wait indefinitely
+            expired = False
+            if self.settings.keepalive > 0:
+                self._keepalive -= dt
+                expired = self._keepalive <= 0
+            if expired or self._should_advance():
+                self._advance()
 
         self.draw_group.update()
 
+    def _type(self, dt: float):
+        settings = self.settings
+        chars_per_second = _chars_per_second(settings)
+        if chars_per_second == 0 or (settings.skip and settings.skip.is_pressed()):
+            for line in self.lines:
+                line.reveal_all()
+            self._skip_typed_lines()
+            return
+
+        # reveal as many characters as the elapsed time allows
+        self._chars_due += dt * chars_per_second
+        while self._chars_due >= 1 and not self.finished_typing:
+            line = self.lines[self._typing]
+            count = min(int(self._chars_due), line.length - line.revealed)
+            line.reveal(line.revealed + count)
+            self._chars_due -= count
+            self._skip_typed_lines()
+
     def _should_advance(self) -> bool:
         advance_text = self.auto_scroll and self._auto_scroll_timer <= 0
         advance_text_key = self.settings.advance_text
@@ -346,9 +842,9 @@ class TextBox(scenes.Overlay):
 
     def _next_text_window(self):
         self.reset()
-        self._new_writer(self._text_windows.popleft())
+        self._show_page(self._text_windows.popleft())
 
-    def draw(self) -> List[pygame.Rect]:
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
         return self.draw_group.draw(self.screen)
 
     def dirty_all_sprites(self):
@@ -357,15 +853,11 @@ class TextBox(scenes.Overlay):
 
     def reset(self):
         super().reset()
-        self.text_box.dirty = 1
-        # XXX: is this faster than removing the text layer?
-        self.draw_group.empty()
-        self.draw_group.add(self.text_box, self.indicator)
+        for line in self.lines:
+            line.clear()
 
         if self.indicator is not None:
             self.indicator.visible = False
 
-        self._auto_scroll_timer = int(
-            self.settings.auto_scroll * self.settings.framerate
-        )
-        self.writer = None
+        self._auto_scroll_timer = self.settings.auto_scroll
+        self._page = None
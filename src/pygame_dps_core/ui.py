@@ -5,7 +5,7 @@ import pygame
 from pygame.sprite import LayeredDirty
 
 from . import scenes, sprites, types
-from .text import TextOptions, text_sprite
+from .text import TextOptions, render_text, text_position
 
 
 @dataclasses.dataclass(frozen=True)
@@ -27,6 +27,10 @@ class Button(sprites.GameSprite):
 
     def __init__(self, opts: ButtonOptions, on_click: Callable):
         super().__init__(opts)
+        if opts.image is not None and opts.text:
+            # text is drawn onto the image, which may be shared with other
+            # buttons by the asset registry
+            self.image = opts.image.copy()
         self.text = opts.text
         self.text_opts = opts.text_opts
         if self.text_opts is not None:
@@ -49,8 +53,10 @@ class Button(sprites.GameSprite):
     def update(self):
         if self.text and self.text_opts is not None:
             opts = self.hover_opts if self.hovered else self.text_opts
-            sprite = text_sprite(self.text, opts, self.rect.move(0, 0))
-            self.image.blit(sprite.image, sprite.rect)
+            # blit the text directly, rather than through a new text sprite
+            # every frame
+            img = render_text(self.text, opts)
+            self.image.blit(img, text_position(img.get_size(), opts, self.rect))
 
 
 class Menu(scenes.Scene):
@@ -86,7 +92,7 @@ class Menu(scenes.Scene):
     def update(self, dt: float):
         self.buttons.update()
 
-    def draw(self) -> List[pygame.Rect]:
+    def draw(self, alpha: float | None = None) -> List[pygame.Rect]:
         return self.buttons.draw(self.screen)
 
     def dirty_all_sprites(self):